@@ -0,0 +1,125 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Union
+
+from page_store import DEVDOCS_CACHE_DIR
+
+BLOB_DIR = os.path.abspath(os.path.join(DEVDOCS_CACHE_DIR, "blobs"))
+# Payloads above this many bytes are written to BLOB_DIR instead of the JSON-RPC line.
+BLOB_THRESHOLD = 64 * 1024
+
+BLOB_KEY = "$blob"
+# Blobs are deleted once read; ones never read (e.g. the call timed out) expire after this.
+BLOB_MAX_AGE = 600.0
+SWEEP_INTERVAL = 60.0
+
+_last_sweep = 0.0
+_sweep_lock = threading.Lock()
+
+
+def sweep_blobs(max_age: float = BLOB_MAX_AGE) -> int:
+    """Deletes blob files older than max_age seconds; returns how many were removed."""
+    removed = 0
+    cutoff = time.time() - max_age
+    try:
+        names = os.listdir(BLOB_DIR)
+    except OSError:
+        return 0
+    for name in names:
+        path = os.path.join(BLOB_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def _maybe_sweep():
+    global _last_sweep
+    now = time.monotonic()
+    if now - _last_sweep < SWEEP_INTERVAL or not _sweep_lock.acquire(blocking=False):
+        return
+    try:
+        _last_sweep = now
+        sweep_blobs()
+    finally:
+        _sweep_lock.release()
+
+
+def _write_blob(data: bytes) -> Dict[str, Any]:
+    _maybe_sweep()
+    digest = hashlib.sha256(data).hexdigest()
+    path = os.path.join(BLOB_DIR, f"{digest[:16]}-{uuid.uuid4().hex}.txt")
+    os.makedirs(BLOB_DIR, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as file:
+        file.write(data)
+    os.replace(tmp, path)
+    return {BLOB_KEY: path, "sha256": digest, "size": len(data)}
+
+
+def offload(text: str, threshold: Optional[int] = None) -> Union[str, Dict[str, Any]]:
+    """Returns `text` itself if it is small, otherwise a handle to a file in BLOB_DIR.
+
+    Every handle gets its own file, so the reader can delete it without affecting other calls.
+    """
+    data = text.encode("utf-8")
+    if len(data) <= (BLOB_THRESHOLD if threshold is None else threshold):
+        return text
+    return _write_blob(data)
+
+
+def offload_json(value: Any, threshold: Optional[int] = None) -> Any:
+    """Like offload() for JSON-serializable values; resolve_blobs() gives back the value itself."""
+    data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+    if len(data) <= (BLOB_THRESHOLD if threshold is None else threshold):
+        return value
+    handle = _write_blob(data)
+    handle["json"] = True
+    return handle
+
+
+def is_blob(value: Any) -> bool:
+    return isinstance(value, dict) and BLOB_KEY in value
+
+
+def open_blob(handle: Dict[str, Any]) -> mmap.mmap:
+    """Read-only memory map of the blob; callers that can work on bytes avoid any copy."""
+    with open(handle[BLOB_KEY], "rb") as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def read_blob(handle: Dict[str, Any], delete: bool = True) -> str:
+    """Decodes the blob into a str (one copy, straight from the page cache via mmap) and
+    deletes the file unless `delete` is False."""
+    try:
+        if not handle.get("size"):
+            return ""
+        with open_blob(handle) as mapped:
+            return str(memoryview(mapped), "utf-8")
+    finally:
+        if delete:
+            try:
+                os.remove(handle[BLOB_KEY])
+            except OSError:
+                pass
+
+
+def resolve_blobs(value: Any) -> Any:
+    """Replaces blob handles anywhere inside a tool result with their text, or the decoded
+    value for offload_json() handles (deleting the files)."""
+    if is_blob(value):
+        text = read_blob(value)
+        return json.loads(text) if value.get("json") and text else text
+    if isinstance(value, list):
+        return [resolve_blobs(item) for item in value]
+    if isinstance(value, dict):
+        return {key: resolve_blobs(item) for key, item in value.items()}
+    return value
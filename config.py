@@ -1,4 +1,4 @@
-from langchain_community.chat_models import ChatOpenAI
+import threading
 
 DEV_DOCS_SLUGS = [
     "python", "go", "javascript", "typescript", "rust", "cpp", "c", "java",
@@ -29,9 +29,30 @@ TECH_SYNONYMS = {
 
 DEBUG_RAG = True
 
-llm = ChatOpenAI(
-    model="meta-llama-3.1-8b-instruct",
-    api_key="lm-studio",
-    base_url="http://localhost:1234/v1",
-    temperature=0.4,
-)
+# "asyncio" runs server.py over asyncio streams (tool calls are awaited on the event loop);
+# "stdio" runs it as thread-served subprocess(es); "inprocess" calls its tools directly.
+MCP_TRANSPORT = "asyncio"
+# Number of server.py processes behind MCPServerPool ("stdio" transport).
+MCP_POOL_SIZE = 3
+# Max parallel DevDocs searches / page-read batches per loader call.
+DEVDOCS_LOAD_CONCURRENCY = 4
+
+_llm = None
+_llm_lock = threading.Lock()
+
+
+def get_llm():
+    """Shared ChatOpenAI client, created on first use (importing langchain_community is slow)."""
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                from langchain_community.chat_models import ChatOpenAI
+
+                _llm = ChatOpenAI(
+                    model="meta-llama-3.1-8b-instruct",
+                    api_key="lm-studio",
+                    base_url="http://localhost:1234/v1",
+                    temperature=0.4,
+                )
+    return _llm
@@ -0,0 +1,142 @@
+import argparse
+import json
+import os
+import re
+import shutil
+from typing import Any, Callable, Dict, List, Optional
+
+from docs_index import SlugIndex
+from json_stream import iter_json_object
+from page_store import PageStore
+
+
+def _load_json(path: str) -> Any:
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def source_manifest(src_dir: str) -> List[Dict[str, Any]]:
+    """docs.json of a downloaded DevDocs docs directory, or one rebuilt from per-doc meta.json."""
+    manifest_path = os.path.join(src_dir, "docs.json")
+    if os.path.exists(manifest_path):
+        return _load_json(manifest_path)
+    manifest = []
+    for name in sorted(os.listdir(src_dir)):
+        if not os.path.exists(os.path.join(src_dir, name, "index.json")):
+            continue
+        meta_path = os.path.join(src_dir, name, "meta.json")
+        meta = _load_json(meta_path) if os.path.exists(meta_path) else {}
+        manifest.append({"name": meta.get("name", name), "slug": name, **meta})
+    return manifest
+
+
+def _version_key(slug: str) -> tuple:
+    version = slug.split("~", 1)[1] if "~" in slug else ""
+    return tuple(int(part) for part in re.findall(r"\d+", version))
+
+
+def select_docs(
+    manifest: List[Dict[str, Any]],
+    wanted: List[str],
+    all_versions: bool = False,
+) -> List[Dict[str, Any]]:
+    """Docs for `wanted` slugs. An exact slug ('python~3.11') is taken as is; a bare name
+    ('python') picks the unversioned doc if there is one, else its latest version, or every
+    version with all_versions=True."""
+    by_slug = {(doc.get("slug") or "").lower(): doc for doc in manifest}
+    selected: List[Dict[str, Any]] = []
+    for w in (w.lower() for w in wanted):
+        versions = [slug for slug in by_slug if slug.startswith(f"{w}~")]
+        if all_versions:
+            picked = ([w] if w in by_slug else []) + versions
+        elif w in by_slug:
+            picked = [w]
+        else:
+            picked = [max(versions, key=_version_key)] if versions else []
+        for slug in picked:
+            if by_slug[slug] not in selected:
+                selected.append(by_slug[slug])
+    return selected
+
+
+def _merge_manifest(path: str, bundled: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Existing bundle docs.json with this run's docs added or replaced (by slug)."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    if os.path.exists(path):
+        for doc in _load_json(path):
+            merged[doc.get("slug") or ""] = doc
+    for doc in bundled:
+        merged[doc["slug"]] = doc
+    return list(merged.values())
+
+
+def build_bundle(
+    src_dir: str,
+    out_dir: str,
+    slugs: List[str],
+    fulltext: bool = False,
+    progress: Callable[[str], None] = print,
+    all_versions: bool = False,
+) -> List[str]:
+    """Copies index.json of the selected docs into out_dir, imports their db.json into
+    out_dir/pages.sqlite3 and adds them to the bundle's docs.json (docs bundled by earlier
+    runs stay listed). Returns the slugs bundled by this run."""
+    os.makedirs(os.path.join(out_dir, "docs"), exist_ok=True)
+    store = PageStore(base_url="", cache_dir=out_dir, offline=True)
+
+    bundled: List[Dict[str, Any]] = []
+    selected = select_docs(source_manifest(src_dir), slugs, all_versions=all_versions)
+    for i, doc in enumerate(selected, start=1):
+        slug = doc["slug"]
+        index_path = os.path.join(src_dir, slug, "index.json")
+        db_path = os.path.join(src_dir, slug, "db.json")
+        if not (os.path.exists(index_path) and os.path.exists(db_path)):
+            progress(f"[{i}/{len(selected)}] {slug}: skipped (no index.json/db.json)")
+            continue
+
+        os.makedirs(os.path.join(out_dir, "docs", slug), exist_ok=True)
+        shutil.copyfile(index_path, os.path.join(out_dir, "docs", slug, "index.json"))
+        with open(db_path, "r", encoding="utf-8") as file:
+            chunks = iter(lambda: file.read(1 << 16), "")
+            pages = store.import_records(slug, iter_json_object(chunks))
+        if fulltext:
+            index = SlugIndex(slug, _load_json(index_path)["entries"])
+            store.build_fulltext(slug, index.page_titles())
+        bundled.append(doc)
+        progress(f"[{i}/{len(selected)}] {slug}: {pages} pages")
+
+    manifest_path = os.path.join(out_dir, "docs", "docs.json")
+    manifest = _merge_manifest(manifest_path, bundled)
+    tmp = f"{manifest_path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False)
+    os.replace(tmp, manifest_path)
+    return [doc["slug"] for doc in bundled]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Build an offline DevDocs bundle for server.py (run it with DEVDOCS_BUNDLE=<out>)."
+    )
+    parser.add_argument("--src", required=True, help="downloaded DevDocs docs dir (e.g. devdocs/public/docs)")
+    parser.add_argument("--out", required=True, help="bundle directory to create/update")
+    parser.add_argument("--slugs", nargs="*", help="doc slugs to include (default: config.DEV_DOCS_SLUGS)")
+    parser.add_argument("--fulltext", action="store_true", help="also build the FTS index for every doc")
+    parser.add_argument(
+        "--all-versions",
+        action="store_true",
+        help="bundle every version of a bare slug (default: only the latest)",
+    )
+    args = parser.parse_args(argv)
+
+    slugs = args.slugs
+    if not slugs:
+        from config import DEV_DOCS_SLUGS
+        slugs = DEV_DOCS_SLUGS
+
+    bundled = build_bundle(args.src, args.out, slugs, fulltext=args.fulltext, all_versions=args.all_versions)
+    print(f"Bundle ready: {args.out} ({len(bundled)} docs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import os
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Max simultaneous connections to the DevDocs host; extra requests wait for a free one.
+HTTP_CONCURRENCY = int(os.environ.get("DEVDOCS_HTTP_CONCURRENCY", "8"))
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def session() -> requests.Session:
+    """Process-wide keep-alive session (urllib3 connection pool is thread-safe)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                sess = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=HTTP_CONCURRENCY,
+                    pool_block=True,
+                    max_retries=1,
+                )
+                sess.mount("http://", adapter)
+                sess.mount("https://", adapter)
+                sess.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+                _session = sess
+    return _session
+
+
+def get(
+    url: str,
+    timeout: float = 10,
+    etag: str = "",
+    last_modified: str = "",
+    stream: bool = False,
+) -> requests.Response:
+    """GET through the shared pool; pass etag / last_modified for a conditional request (304)."""
+    headers: Dict[str, str] = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return session().get(url, headers=headers, timeout=timeout, stream=stream)
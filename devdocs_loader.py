@@ -2,132 +2,185 @@ import asyncio
 import logging
 from typing import Dict, List, Optional
 
-from langchain_core.documents import Document
+from config import DEVDOCS_LOAD_CONCURRENCY
+from ingest_pipeline import IngestPipeline
+from mcp_client import AsyncMCPServerClient
 
-from helpers import clean_html, safe_print
-from mcp_client import MCPServerClient
-from rag_store import vs_add_documents
 
+def _search_args(tech: str, keyword: str, max_hits: Optional[int]) -> Dict[str, object]:
+    args: Dict[str, object] = {"doc_name": tech, "keyword": keyword}
+    if max_hits is not None:
+        args["limit"] = max_hits
+    return args
 
-def load_devdocs_for_tech(mcp: MCPServerClient, tech: str, max_hits: Optional[int] = None) -> bool:
+
+def _new_pages(tech: str, hits: List[dict], seen_paths: set) -> List[Dict[str, str]]:
+    pages = []
+    for hit in hits:
+        slug = hit.get("doc_slug") or tech
+        path = (hit.get("path") or "").split("#")[0]
+        if not path:
+            continue
+        key = f"{slug}::{path}"
+        if key in seen_paths:
+            continue
+        seen_paths.add(key)
+        pages.append({"doc_slug": slug, "path": path, "url": hit.get("url")})
+    return pages
+
+
+def _has_hits(search_res) -> bool:
+    return bool(search_res and isinstance(search_res, list) and len(search_res) > 0)
+
+
+def _submit_pages(pipeline: IngestPipeline, tech: str, pages: List[Dict[str, str]]) -> None:
+    for page in pages:
+        pipeline.submit((tech, page))
+
+
+async def _ingest_pages(
+    mcp: AsyncMCPServerClient,
+    tech: str,
+    pages: List[Dict[str, str]],
+    concurrency: int = DEVDOCS_LOAD_CONCURRENCY,
+    pipeline: Optional[IngestPipeline] = None,
+) -> bool:
+    """Feeds pages to `pipeline` (True once queued) or to a private pipeline (True if anything was stored).
+
+    The pipeline's fetch threads call back into the event loop (mcp.blocking()), so
+    submit(), which blocks on a full queue, and close() run off the loop.
+    """
+    if not pages:
+        return False
+
+    if pipeline is not None:
+        await asyncio.to_thread(_submit_pages, pipeline, tech, pages)
+        return True
+
+    own = IngestPipeline(mcp.blocking(), fetch_workers=concurrency)
+    try:
+        await asyncio.to_thread(_submit_pages, own, tech, pages)
+        stats = await asyncio.to_thread(own.close)
+    except BaseException:
+        own.cancel()
+        raise
+    logging.debug(f"[RAG] {tech} ingest stages: {stats}")
+    return own.added.get(tech, 0) > 0
+
+
+async def load_devdocs_for_tech(
+    mcp: AsyncMCPServerClient,
+    tech: str,
+    max_hits: Optional[int] = None,
+    concurrency: int = DEVDOCS_LOAD_CONCURRENCY,
+    pipeline: Optional[IngestPipeline] = None,
+) -> bool:
     try:
-        search_res = mcp.call_tool("search_devdocs", {"doc_name": tech, "keyword": "introduction"})
+        search_res = await mcp.call_tool("search_devdocs", _search_args(tech, "introduction", max_hits))
     except Exception:
         search_res = None
 
-    if not (search_res and isinstance(search_res, list) and len(search_res) > 0):
+    if not _has_hits(search_res):
         try:
-            search_res = mcp.call_tool("search_devdocs", {"doc_name": tech, "keyword": tech})
+            search_res = await mcp.call_tool("search_devdocs", _search_args(tech, tech, max_hits))
         except Exception:
             search_res = None
 
-    if not (search_res and isinstance(search_res, list) and len(search_res) > 0):
+    if not _has_hits(search_res):
         return False
 
-    added = 0
     seen_paths = set()
     hits_iter = search_res if max_hits is None else search_res[:max_hits]
+    return await _ingest_pages(mcp, tech, _new_pages(tech, hits_iter, seen_paths), concurrency, pipeline)
 
-    for hit in hits_iter:
-        slug = hit.get("doc_slug") or tech
-        path = (hit.get("path") or "").split("#")[0]
-        url = hit.get("url")
-        if not path:
-            continue
-        key = f"{slug}::{path}"
-        if key in seen_paths:
-            continue
-        seen_paths.add(key)
 
-        html_content = mcp.call_tool("read_devdocs_page", {"doc_slug": slug, "path": path})
-        if not html_content or not isinstance(html_content, str):
-            continue
-        if "не найдена" in html_content.lower():
-            continue
+async def _search_topic(mcp: AsyncMCPServerClient, tech: str, topic: str, max_hits: Optional[int]) -> List[dict]:
+    try:
+        search_res = await mcp.call_tool("search_devdocs", _search_args(tech, topic, max_hits))
+    except Exception:
+        search_res = None
 
-        cleaned = clean_html(html_content)
-        if len(cleaned) < 160:
-            continue
+    if not _has_hits(search_res):
+        try:
+            search_res = await mcp.call_tool(
+                "search_devdocs_fulltext",
+                {"doc_name": tech, "query": topic, "limit": max_hits or 5},
+            )
+        except Exception:
+            search_res = None
 
-        doc = Document(
-            page_content=cleaned,
-            metadata={"source": "devdocs", "tech": tech, "url": url, "path": path},
-        )
-        vs_add_documents([doc])
-        added += 1
+    if not _has_hits(search_res):
+        try:
+            search_res = await mcp.call_tool("search_devdocs", _search_args(tech, tech, max_hits))
+        except Exception:
+            search_res = None
 
-    return added > 0
+    return search_res if _has_hits(search_res) else []
 
 
-def load_devdocs_for_tech_with_topics(
-    mcp: MCPServerClient,
+async def load_devdocs_for_tech_with_topics(
+    mcp: AsyncMCPServerClient,
     tech: str,
     topics: List[str],
     max_hits: Optional[int] = None,
+    concurrency: int = DEVDOCS_LOAD_CONCURRENCY,
+    pipeline: Optional[IngestPipeline] = None,
 ) -> bool:
+    topics = list(topics or [])
+    if not topics:
+        return False
 
-    added = 0
-    seen_paths = set()
-    for topic in (topics or []):
-        try:
-            search_res = mcp.call_tool("search_devdocs", {"doc_name": tech, "keyword": topic})
-        except Exception:
-            search_res = None
+    # Topic searches run concurrently on the event loop; results are merged in topic
+    # order, so seen_paths dedup and the per-topic max_hits cap behave as before.
+    semaphore = asyncio.Semaphore(max(1, concurrency))
 
-        if not (search_res and isinstance(search_res, list) and len(search_res) > 0):
-            try:
-                search_res = mcp.call_tool("search_devdocs", {"doc_name": tech, "keyword": tech})
-            except Exception:
-                search_res = None
+    async def _one(topic: str) -> List[dict]:
+        async with semaphore:
+            return await _search_topic(mcp, tech, topic, max_hits)
 
-        if not (search_res and isinstance(search_res, list) and len(search_res) > 0):
-            continue
+    per_topic = await asyncio.gather(*(_one(topic) for topic in topics))
 
+    pages: List[Dict[str, str]] = []
+    seen_paths = set()
+    for search_res in per_topic:
         hits_iter = search_res if max_hits is None else search_res[:max_hits]
-        for hit in hits_iter:
-            slug = hit.get("doc_slug") or tech
-            path = (hit.get("path") or "").split("#")[0]
-            url = hit.get("url")
-            if not path:
-                continue
-            key = f"{slug}::{path}"
-            if key in seen_paths:
-                continue
-            seen_paths.add(key)
+        pages.extend(_new_pages(tech, hits_iter, seen_paths))
 
-            html_content = mcp.call_tool("read_devdocs_page", {"doc_slug": slug, "path": path})
-            if not html_content or not isinstance(html_content, str):
-                continue
-            if "не найдена" in html_content.lower():
-                continue
-            cleaned = clean_html(html_content)
-            if len(cleaned) < 160:
-                continue
-            doc = Document(
-                page_content=cleaned,
-                metadata={"source": "devdocs", "tech": tech, "url": url, "path": path},
-            )
-            vs_add_documents([doc])
-            added += 1
-    return added > 0
+    return await _ingest_pages(mcp, tech, pages, concurrency, pipeline)
 
 
 async def background_load_other_techs(
-    mcp: MCPServerClient,
+    mcp: AsyncMCPServerClient,
     pending: List[str],
     loaded_techs: set,
     topics_map: Optional[Dict[str, List[str]]] = None,
 ):
+    # One pipeline for all techs: searches for the next tech overlap with
+    # embedding of the previous one. A tech counts as loaded only once its
+    # documents are actually in the store, i.e. after close().
+    pipeline = IngestPipeline(mcp.blocking(), fetch_workers=DEVDOCS_LOAD_CONCURRENCY)
+    try:
+        for tech in pending:
+            if tech in loaded_techs:
+                continue
+            topics = (topics_map or {}).get(tech) if topics_map else None
+            if topics:
+                ok = await load_devdocs_for_tech_with_topics(mcp, tech, topics, 2, pipeline=pipeline)
+            else:
+                ok = await load_devdocs_for_tech(mcp, tech, 2, pipeline=pipeline)
+            if ok:
+                logging.info(f"[BG RAG] Queued: {tech}")
+            else:
+                logging.info(f"[BG RAG] Not found / not loaded: {tech}")
+        stats = await asyncio.to_thread(pipeline.close)
+    except BaseException:
+        # Cancelled (e.g. wait_for() at the end of the interview) or failed: drop the
+        # queued work without joining stage threads that may sit in a page read for
+        # minutes; they exit on their own once their current call returns.
+        pipeline.cancel()
+        logging.info(f"[BG RAG] Stopped; loaded pages per tech: {pipeline.added}")
+        raise
     for tech in pending:
-        if tech in loaded_techs:
-            continue
-        topics = (topics_map or {}).get(tech) if topics_map else None
-        if topics:
-            ok = await asyncio.to_thread(load_devdocs_for_tech_with_topics, mcp, tech, topics, 2)
-        else:
-            ok = await asyncio.to_thread(load_devdocs_for_tech, mcp, tech, 2)
-        if ok:
+        if pipeline.added.get(tech, 0) > 0:
             loaded_techs.add(tech)
-            logging.info(f"[BG RAG] Loaded: {tech}")
-        else:
-            logging.info(f"[BG RAG] Not found / not loaded: {tech}")
+    logging.info(f"[BG RAG] Loaded pages per tech: {pipeline.added}; stages: {stats}")
@@ -0,0 +1,304 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+
+import devdocs_http
+from page_store import DEVDOCS_CACHE_DIR
+
+DOCS_CACHE_TTL = float(os.environ.get("DEVDOCS_CACHE_TTL", "3600"))
+DOCS_DISK_CACHE = os.environ.get("DEVDOCS_DISK_CACHE", "1") != "0"
+
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+
+class _Entry:
+    __slots__ = ("data", "etag", "last_modified", "checked_at")
+
+    def __init__(self, data: Any, etag: str = "", last_modified: str = "", checked_at: float = 0.0):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.checked_at = checked_at
+
+
+class JSONCache:
+    """In-process (and optionally on-disk) cache of JSON documents with TTL + ETag revalidation."""
+
+    def __init__(self, ttl: float = DOCS_CACHE_TTL, disk_dir: Optional[str] = None):
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        self._entries: Dict[str, _Entry] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, url: str) -> threading.Lock:
+        with self._guard:
+            lock = self._locks.get(url)
+            if lock is None:
+                lock = self._locks[url] = threading.Lock()
+            return lock
+
+    def _disk_path(self, url: str) -> str:
+        return os.path.join(self.disk_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _load_disk(self, url: str) -> Optional[_Entry]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(url), "r", encoding="utf-8") as file:
+                raw = json.load(file)
+        except (OSError, ValueError):
+            return None
+        # checked_at=0: disk copies are always revalidated once per process.
+        return _Entry(raw.get("data"), raw.get("etag", ""), raw.get("last_modified", ""), 0.0)
+
+    def _save_disk(self, url: str, entry: _Entry):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(url)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as file:
+                json.dump(
+                    {"url": url, "etag": entry.etag, "last_modified": entry.last_modified, "data": entry.data},
+                    file,
+                    ensure_ascii=False,
+                )
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def get(self, url: str, timeout: float = 5) -> Any:
+        entry = self._entries.get(url)
+        if entry and time.time() - entry.checked_at < self.ttl:
+            return entry.data
+
+        with self._lock_for(url):
+            entry = self._entries.get(url) or self._load_disk(url)
+            now = time.time()
+            if entry and now - entry.checked_at < self.ttl:
+                return entry.data
+
+            try:
+                resp = devdocs_http.get(
+                    url,
+                    timeout=timeout,
+                    etag=entry.etag if entry else "",
+                    last_modified=entry.last_modified if entry else "",
+                )
+            except requests.RequestException:
+                if entry:
+                    return entry.data
+                raise
+
+            if resp.status_code == 304 and entry:
+                entry.checked_at = now
+                self._entries[url] = entry
+                return entry.data
+
+            resp.raise_for_status()
+            entry = _Entry(
+                resp.json(),
+                resp.headers.get("ETag", ""),
+                resp.headers.get("Last-Modified", ""),
+                now,
+            )
+            self._entries[url] = entry
+            self._save_disk(url, entry)
+            return entry.data
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text)
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SlugIndex:
+    """Entries of one doc's index.json, precompiled for ranked keyword search.
+
+    Ranking: exact name > name prefix > token match > substring > trigram similarity.
+    """
+
+    MEMO_SIZE = 256
+    FUZZY_THRESHOLD = 0.4
+
+    def __init__(self, slug: str, entries: List[Dict[str, Any]]):
+        self.slug = slug
+        self.entries = entries
+        self.names_lower = [(entry.get("name") or "").lower() for entry in entries]
+        self.name_tokens = [set(_tokens(name)) for name in self.names_lower]
+        self.token_index: Dict[str, set] = {}
+        for i, tokens in enumerate(self.name_tokens):
+            for tok in tokens:
+                self.token_index.setdefault(tok, set()).add(i)
+        self.trigram_counts: List[int] = []
+        self.trigram_index: Dict[str, List[int]] = {}
+        for i, name in enumerate(self.names_lower):
+            grams = _trigrams(name)
+            self.trigram_counts.append(len(grams))
+            for gram in grams:
+                self.trigram_index.setdefault(gram, []).append(i)
+        self._memo: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._memo_lock = threading.Lock()
+
+    def _score(self, i: int, needle: str, needle_tokens: List[str]) -> float:
+        name = self.names_lower[i]
+        if name == needle:
+            return 100.0
+        if name.startswith(needle):
+            return 80.0
+        if needle_tokens and all(tok in self.name_tokens[i] for tok in needle_tokens):
+            return 60.0
+        if needle in name:
+            return 40.0
+        return 0.0
+
+    def _substring_candidates(self, needle: str) -> Iterable[int]:
+        """Entries that contain every 3-char window of `needle` (a superset of substring matches).
+
+        Needles shorter than a trigram have no window to look up and fall back to all entries.
+        """
+        if len(needle) < 3:
+            return range(len(self.names_lower))
+        postings = sorted(
+            (self.trigram_index.get(needle[i:i + 3], ()) for i in range(len(needle) - 2)),
+            key=len,
+        )
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+        return candidates
+
+    def _rank(self, needle: str) -> List[int]:
+        needle_tokens = _tokens(needle)
+        scores: Dict[int, float] = {}
+        for i in self._substring_candidates(needle):
+            if needle in self.names_lower[i]:
+                scores[i] = self._score(i, needle, needle_tokens)
+        if needle_tokens:
+            token_hits = set.intersection(*(self.token_index.get(tok, set()) for tok in needle_tokens))
+            for i in token_hits:
+                if i not in scores:
+                    scores[i] = self._score(i, needle, needle_tokens)
+
+        grams = _trigrams(needle)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for i in self.trigram_index.get(gram, ()):
+                if i not in scores:
+                    shared[i] = shared.get(i, 0) + 1
+        for i, common in shared.items():
+            similarity = common / (len(grams) + self.trigram_counts[i] - common)
+            if similarity >= self.FUZZY_THRESHOLD:
+                scores[i] = 30.0 * similarity
+
+        return sorted(scores, key=lambda i: (-scores[i], len(self.names_lower[i]), i))
+
+    def page_titles(self) -> Dict[str, str]:
+        """Title per page path (anchor stripped): the entry without an anchor, else the first anchored one."""
+        titles: Dict[str, str] = {}
+        exact = set()
+        for entry in self.entries:
+            path = entry.get("path") or ""
+            base = path.split("#")[0]
+            if "#" not in path and base not in exact:
+                titles[base] = entry.get("name") or base
+                exact.add(base)
+            else:
+                titles.setdefault(base, entry.get("name") or base)
+        return titles
+
+    def search(self, keyword: str, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        needle = keyword.lower().strip()
+        with self._memo_lock:
+            ranked = self._memo.get(needle)
+            if ranked is not None:
+                self._memo.move_to_end(needle)
+        if ranked is None:
+            ranked = self._rank(needle)
+            with self._memo_lock:
+                self._memo[needle] = ranked
+                if len(self._memo) > self.MEMO_SIZE:
+                    self._memo.popitem(last=False)
+        offset = max(0, offset)
+        window = ranked[offset:] if limit is None else ranked[offset:offset + max(0, limit)]
+        return [self.entries[i] for i in window]
+
+
+class DocsCatalog:
+    """docs.json manifest with a prefix map for slug resolution plus per-slug SlugIndex objects."""
+
+    def __init__(self, base_url: str, cache: Optional[JSONCache] = None):
+        self.base_url = base_url
+        if cache is None:
+            cache = JSONCache(disk_dir=os.path.join(DEVDOCS_CACHE_DIR, "http") if DOCS_DISK_CACHE else None)
+        self.cache = cache
+        self._manifest_data: Any = None
+        self._prefix_map: Dict[str, str] = {}
+        self._indexes: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, relpath: str, timeout: float) -> Any:
+        return self.cache.get(f"{self.base_url}/{relpath}", timeout=timeout)
+
+    def manifest(self) -> List[Dict[str, Any]]:
+        return self._load("docs/docs.json", timeout=2)
+
+    def _manifest(self) -> Dict[str, str]:
+        data = self.manifest()
+        if data is self._manifest_data:
+            return self._prefix_map
+        prefix_map: Dict[str, str] = {}
+        for doc in data:
+            slug = doc.get("slug") or ""
+            for i in range(len(slug) + 1):
+                prefix_map.setdefault(slug[:i], slug)
+        with self._lock:
+            self._manifest_data = data
+            self._prefix_map = prefix_map
+        return prefix_map
+
+    def resolve_slug(self, doc_name: str) -> Optional[str]:
+        return self._manifest().get(doc_name.lower())
+
+    def slug_index(self, slug: str) -> SlugIndex:
+        data = self._load(f"docs/{slug}/index.json", timeout=5)
+        cached = self._indexes.get(slug)
+        if cached and cached[0] is data:
+            return cached[1]
+        index = SlugIndex(slug, data["entries"])
+        with self._lock:
+            self._indexes[slug] = (data, index)
+        return index
+
+
+class BundleCatalog(DocsCatalog):
+    """DocsCatalog over an offline bundle directory (see devdocs_bundle.py); no network."""
+
+    def __init__(self, bundle_dir: str):
+        super().__init__(base_url="", cache=JSONCache(ttl=float("inf")))
+        self.bundle_dir = bundle_dir
+        self._files: Dict[str, Any] = {}
+
+    def _load(self, relpath: str, timeout: float) -> Any:
+        data = self._files.get(relpath)
+        if data is None:
+            with open(os.path.join(self.bundle_dir, relpath), "r", encoding="utf-8") as file:
+                data = json.load(file)
+            self._files[relpath] = data
+        return data
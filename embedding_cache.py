@@ -0,0 +1,162 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from page_store import DEVDOCS_CACHE_DIR
+
+EMBEDDING_CACHE_DIR = os.environ.get("EMBEDDING_CACHE_DIR", os.path.join(DEVDOCS_CACHE_DIR, "embeddings"))
+# Max cached vectors; the least recently used ones are evicted beyond this.
+EMBEDDING_CACHE_SIZE = int(os.environ.get("EMBEDDING_CACHE_SIZE", "20000"))
+# The index file is rewritten at most this often (and on exit).
+SAVE_INTERVAL = 5.0
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that keeps vectors in a memory-mapped float32 file keyed by text hash.
+
+    Layout under `cache_dir`: vectors.f32 is a (capacity, dim) array of slots and index.json
+    maps text hashes to slots in LRU order. Documents and queries are cached separately.
+    """
+
+    def __init__(
+        self,
+        base: Embeddings,
+        model_name: str,
+        cache_dir: str = EMBEDDING_CACHE_DIR,
+        capacity: int = EMBEDDING_CACHE_SIZE,
+    ):
+        self.base = base
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.capacity = max(1, capacity)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._slots: "OrderedDict[str, int]" = OrderedDict()
+        self._free: List[int] = []
+        self._vectors: Optional[np.memmap] = None
+        self._dim = 0
+        self._dirty = False
+        self._saved_at = 0.0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._vectors_path = os.path.join(cache_dir, "vectors.f32")
+        self._index_path = os.path.join(cache_dir, "index.json")
+        self._load()
+        atexit.register(self.flush)
+
+    def _load(self):
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as file:
+                meta = json.load(file)
+        except (OSError, ValueError):
+            return
+        if meta.get("model") != self.model_name or meta.get("capacity") != self.capacity:
+            return
+        try:
+            self._open(int(meta["dim"]), "r+")
+        except (OSError, ValueError, KeyError):
+            self._vectors = None
+            return
+        used = set()
+        for key, slot in meta.get("entries", []):
+            if 0 <= slot < self.capacity and slot not in used:
+                self._slots[key] = slot
+                used.add(slot)
+        self._free = [slot for slot in range(self.capacity - 1, -1, -1) if slot not in used]
+
+    def _open(self, dim: int, mode: str):
+        self._dim = dim
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode=mode, shape=(self.capacity, dim))
+
+    def _key(self, kind: str, text: str) -> str:
+        return hashlib.sha1(f"{kind}\x1f{text}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            if self._vectors is None:
+                return found
+            for key in keys:
+                slot = self._slots.get(key)
+                if slot is not None:
+                    self._slots.move_to_end(key)
+                    found[key] = self._vectors[slot].tolist()
+        return found
+
+    def _store(self, items: Dict[str, List[float]]):
+        if not items:
+            return
+        evicted = False
+        with self._lock:
+            if self._vectors is None:
+                self._open(len(next(iter(items.values()))), "w+")
+                self._free = list(range(self.capacity - 1, -1, -1))
+            for key, vector in items.items():
+                if len(vector) != self._dim:
+                    continue
+                slot = self._slots.get(key)
+                if slot is None:
+                    if self._free:
+                        slot = self._free.pop()
+                    else:
+                        # A reused slot must not stay mapped to its old key on disk.
+                        _, slot = self._slots.popitem(last=False)
+                        evicted = True
+                self._slots[key] = slot
+                self._vectors[slot] = vector
+            self._dirty = True
+            due = evicted or time.monotonic() - self._saved_at >= SAVE_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Writes the memmap and the index to disk."""
+        with self._lock:
+            if not self._dirty or self._vectors is None:
+                return
+            self._vectors.flush()
+            meta = {
+                "model": self.model_name,
+                "dim": self._dim,
+                "capacity": self.capacity,
+                "entries": list(self._slots.items()),
+            }
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        tmp = f"{self._index_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as file:
+                json.dump(meta, file)
+            os.replace(tmp, self._index_path)
+        except OSError:
+            pass
+
+    def _embed(self, kind: str, texts: List[str], compute) -> List[List[float]]:
+        keys = [self._key(kind, text) for text in texts]
+        found = self._lookup(keys)
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            vectors = compute(list(missing.values()))
+            computed = dict(zip(missing, vectors))
+            self._store(computed)
+            found.update(computed)
+        return [list(found[key]) for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed("doc", texts, self.base.embed_documents)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed("query", [text], lambda batch: [self.base.embed_query(batch[0])])[0]
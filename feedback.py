@@ -1,7 +1,7 @@
 import json
 from typing import Any, Dict
 
-from config import llm
+from config import get_llm
 from helpers import extract_json_object
 
 
@@ -53,7 +53,7 @@ Rules:
 - Roadmap must follow from knowledge_gaps.
 - No text other than JSON.
 """
-    resp = llm.invoke([("human", prompt)])
+    resp = get_llm().invoke([("human", prompt)])
     obj = extract_json_object(resp.content)
     try:
         return json.loads(obj)
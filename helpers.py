@@ -1,13 +1,10 @@
 import asyncio
 import json
 import logging
-import re
 import threading
 from collections import deque
 from datetime import datetime, timezone
 
-from bs4 import BeautifulSoup
-
 CONSOLE_LOCK = threading.Lock()
 INPUT_ACTIVE = threading.Event()
 PRINT_BUFFER = deque()
@@ -23,19 +20,6 @@ CLEAN_CONSOLE_LOGS = True
 SHOW_RAG_IN_CONSOLE = True
 
 
-def clean_html(html_content: str) -> str:
-    if not html_content:
-        return ""
-    soup = BeautifulSoup(html_content, "html.parser")
-    for tag in soup(["script", "style", "nav", "footer", "header", "aside"]):
-        tag.decompose()
-    text = soup.get_text(" ")
-    text = re.sub(r"\s+", " ", text).strip()
-    if len(text) > 3500:
-        text = text[:3500] + "..."
-    return text
-
-
 def extract_json_array(text: str) -> str:
     text = text.strip()
     if "```json" in text:
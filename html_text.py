@@ -0,0 +1,91 @@
+import re
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+
+HEADINGS = ["h1", "h2", "h3", "h4", "h5", "h6"]
+# Headings a page is split at for section documents.
+SECTION_HEADINGS = ["h2", "h3"]
+_STRIP_TAGS = ["script", "style", "nav", "footer", "header", "aside"]
+
+
+def clean_html(html_content: str, max_chars: Optional[int] = 3500) -> str:
+    if not html_content:
+        return ""
+    soup = BeautifulSoup(html_content, "html.parser")
+    for tag in soup(_STRIP_TAGS):
+        tag.decompose()
+    text = soup.get_text(" ")
+    text = re.sub(r"\s+", " ", text).strip()
+    if max_chars is not None and len(text) > max_chars:
+        text = text[:max_chars] + "..."
+    return text
+
+
+def select_section(html_content: str, anchor: str) -> str:
+    """HTML of the part of a page that starts at `anchor` (a heading id) and runs until the next
+    heading of the same or higher level. For anchors on non-heading elements (e.g. a <dt> of an
+    API entry) the enclosing block is returned. Empty string if the anchor is missing."""
+    if not html_content or not anchor:
+        return html_content or ""
+    soup = BeautifulSoup(html_content, "html.parser")
+    start = soup.find(id=anchor)
+    if start is None:
+        return ""
+    heading = start if start.name in HEADINGS else start.find_parent(HEADINGS)
+    if heading is None:
+        return str(start.parent if start.name == "dt" and start.parent else start)
+
+    level = int(heading.name[1])
+    parts = [str(heading)]
+    for sibling in heading.next_siblings:
+        name = getattr(sibling, "name", None)
+        if name in HEADINGS and int(name[1]) <= level:
+            break
+        parts.append(str(sibling))
+    return "".join(parts)
+
+
+def _heading_anchor(heading: Tag) -> str:
+    if heading.get("id"):
+        return heading["id"]
+    inner = heading.find(id=True)
+    return inner["id"] if inner is not None else ""
+
+
+def split_sections(html_content: str, min_chars: int = 160) -> List[Dict[str, str]]:
+    """Splits a page at its h2/h3 headings into {"anchor", "title", "text"} sections.
+
+    `anchor` is the heading id, i.e. what DevDocs index paths point at after '#'; text before
+    the first heading becomes a section with an empty anchor titled by the page's h1.
+    Sections whose cleaned text is shorter than min_chars are dropped."""
+    if not html_content:
+        return []
+    soup = BeautifulSoup(html_content, "html.parser")
+    for tag in soup(_STRIP_TAGS):
+        tag.decompose()
+    h1 = soup.find("h1")
+    sections = [{"anchor": "", "title": h1.get_text(" ", strip=True) if h1 else "", "parts": []}]
+    for node in soup.descendants:
+        if isinstance(node, Tag) and node.name in SECTION_HEADINGS:
+            sections.append({"anchor": _heading_anchor(node), "title": node.get_text(" ", strip=True), "parts": []})
+        elif type(node) is NavigableString:
+            sections[-1]["parts"].append(str(node))
+
+    result = []
+    for section in sections:
+        text = re.sub(r"\s+", " ", " ".join(section["parts"])).strip()
+        if len(text) >= min_chars:
+            result.append({"anchor": section["anchor"], "title": section["title"], "text": text})
+    return result
+
+
+def render_page(html_content: str, format: str = "html", max_chars: Optional[int] = 3500, section: str = "") -> str:
+    """Page payload as returned by the MCP server: optionally narrowed to a section, and
+    cleaned to plain text (capped at max_chars, 0/None = no cap) when format == 'text'."""
+    if section:
+        html_content = select_section(html_content, section)
+    if format != "text":
+        return html_content
+    return clean_html(html_content, max_chars=max_chars or None)
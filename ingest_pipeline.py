@@ -0,0 +1,349 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from mcp_client import MCPServerClient
+from rag_store import (
+    EMBED_BATCH_SIZE,
+    EMBED_FLUSH_SECONDS,
+    vs_embed_documents,
+    vs_new_documents,
+    vs_upsert_embedded,
+)
+
+# Items buffered between two stages; a full queue blocks the stage feeding it.
+STAGE_QUEUE_SIZE = 64
+# Pages per read_devdocs_pages call in the fetch stage.
+PAGE_READ_BATCH = 2
+# Sections longer than this are split into chunks (the server already drops tiny ones).
+CHUNK_CHARS = 1000
+CHUNK_OVERLAP = 100
+
+_DONE = object()
+# Preferred chunk break points, best first: section text arrives with whitespace collapsed,
+# so sentence ends and spaces are what is usually found.
+_BREAKS = ("\n\n", "\n", ". ", "! ", "? ", "; ", " ")
+
+
+class PipelineCancelled(Exception):
+    pass
+
+
+class StageMetrics:
+    __slots__ = ("name", "workers", "items_in", "items_out", "errors", "busy_seconds", "_lock")
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, items_in: int, items_out: int, busy: float, failed: bool = False):
+        with self._lock:
+            self.items_in += items_in
+            self.items_out += items_out
+            self.busy_seconds += busy
+            if failed:
+                self.errors += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "in": self.items_in,
+            "out": self.items_out,
+            "errors": self.errors,
+            "busy_s": round(self.busy_seconds, 3),
+        }
+
+
+class Stage:
+    """One pipeline step: `fn` maps an item (or a list of up to `batch_size` items) to zero or more outputs.
+
+    With batch_size > 1 a worker waits at most `max_delay` seconds to fill a batch.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Any], Iterable[Any]],
+        workers: int = 1,
+        batch_size: int = 1,
+        max_delay: float = 0.0,
+    ):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.max_delay = max_delay
+
+
+class Pipeline:
+    """Chain of stages connected by bounded queues, each stage served by its own worker threads.
+
+    submit() feeds the first stage and blocks while it is full (backpressure).
+    close() waits for everything in flight to drain, and cancel() drops the queued work.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = STAGE_QUEUE_SIZE, name: str = "pipeline"):
+        if not stages:
+            raise ValueError("pipeline needs at least one stage")
+        self.name = name
+        self.stages = stages
+        self.metrics = [StageMetrics(stage.name, stage.workers) for stage in stages]
+        self._queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self._cancelled = threading.Event()
+        self._closed = False
+        self._threads: List[threading.Thread] = []
+        self._remaining = [stage.workers for stage in stages]
+        self._remaining_lock = threading.Lock()
+        for index, stage in enumerate(stages):
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(index,),
+                    name=f"{name}-{stage.name}-{n}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def _put(self, index: int, item: Any) -> None:
+        q = self._queues[index]
+        while True:
+            if self._cancelled.is_set() and item is not _DONE:
+                raise PipelineCancelled()
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _take(self, index: int) -> List[Any]:
+        """Next batch for a worker of stage `index`; a trailing _DONE marks the end of input."""
+        stage = self.stages[index]
+        q = self._queues[index]
+        batch = [q.get()]
+        if batch[0] is _DONE or stage.batch_size == 1:
+            return batch
+        deadline = time.monotonic() + stage.max_delay
+        while len(batch) < stage.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = q.get(timeout=timeout) if timeout > 0 else q.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item is _DONE:
+                break
+        return batch
+
+    def _worker(self, index: int) -> None:
+        stage = self.stages[index]
+        metrics = self.metrics[index]
+        last = index == len(self.stages) - 1
+        while True:
+            batch = self._take(index)
+            done = batch[-1] is _DONE
+            items = batch[:-1] if done else batch
+            if items and not self._cancelled.is_set():
+                started = time.perf_counter()
+                produced = 0
+                failed = False
+                try:
+                    for output in stage.fn(items if stage.batch_size > 1 else items[0]) or ():
+                        if not last:
+                            self._put(index + 1, output)
+                        produced += 1
+                except PipelineCancelled:
+                    pass
+                except Exception:
+                    failed = True
+                    logging.exception(f"[{self.name}] stage '{stage.name}' failed")
+                metrics.record(len(items), produced, time.perf_counter() - started, failed)
+            if done:
+                break
+        with self._remaining_lock:
+            self._remaining[index] -= 1
+            finished = self._remaining[index] == 0
+        if finished and not last:
+            for _ in range(self.stages[index + 1].workers):
+                self._put(index + 1, _DONE)
+
+    def submit(self, item: Any) -> None:
+        if self._cancelled.is_set():
+            raise PipelineCancelled()
+        if self._closed:
+            raise RuntimeError(f"{self.name} is closed")
+        self._put(0, item)
+
+    def close(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Signals end of input and waits for all stages to drain; returns per-stage metrics."""
+        if not self._closed:
+            self._closed = True
+            for _ in range(self.stages[0].workers):
+                self._put(0, _DONE)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return self.stats()
+
+    def cancel(self) -> None:
+        """Drops queued items and stops the stages after their current item."""
+        self._cancelled.set()
+        for q in self._queues:
+            markers = 0
+            while True:
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _DONE:
+                    markers += 1
+            for _ in range(markers):
+                q.put(_DONE)
+        if not self._closed:
+            self._closed = True
+            for _ in range(self.stages[0].workers):
+                self._put(0, _DONE)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [metrics.as_dict() for metrics in self.metrics]
+
+    def __enter__(self) -> "Pipeline":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.cancel()
+        self.close()
+
+
+def chunk_text(text: str, size: int = CHUNK_CHARS, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """Splits text into ~size-char chunks, cutting at paragraph, sentence or word boundaries, with a small overlap."""
+    text = text.strip()
+    if len(text) <= size:
+        return [text] if text else []
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + size)
+        if end < len(text):
+            for sep in _BREAKS:
+                cut = text.rfind(sep, start, end)
+                if cut > start + size // 2:
+                    end = cut + len(sep.rstrip())
+                    break
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+        # The overlap starts at a word, not in the middle of one.
+        space = text.find(" ", start, end)
+        if space != -1:
+            start = space + 1
+    return [chunk for chunk in chunks if chunk]
+
+
+class IngestPipeline(Pipeline):
+    """DevDocs pages -> vector store: fetch -> chunk -> embed -> upsert.
+
+    The server returns each page already cleaned and split into heading
+    sections (format='sections'), so every stored document is one section (or
+    a chunk of a long one) with its anchor in the metadata. Documents already
+    in the store (same content id) skip embedding.
+    submit() takes (tech, page) pairs as produced by devdocs_loader; `added`
+    counts documents per tech present in the store, new or already indexed,
+    once close() has returned.
+    """
+
+    def __init__(
+        self,
+        mcp: MCPServerClient,
+        fetch_workers: int = 4,
+        embed_workers: int = 1,
+        queue_size: int = STAGE_QUEUE_SIZE,
+    ):
+        self.mcp = mcp
+        self.added: Dict[str, int] = {}
+        self._added_lock = threading.Lock()
+        super().__init__(
+            [
+                Stage("fetch", self._fetch, fetch_workers, batch_size=PAGE_READ_BATCH, max_delay=0.05),
+                Stage("chunk", self._chunk, 1),
+                Stage("embed", self._embed, embed_workers, batch_size=EMBED_BATCH_SIZE, max_delay=EMBED_FLUSH_SECONDS),
+                Stage("upsert", self._upsert, 1),
+            ],
+            queue_size=queue_size,
+            name="ingest",
+        )
+
+    def _fetch(self, items: List[Tuple[str, Dict[str, str]]]) -> Iterable[Tuple[str, Dict[str, str], Dict[str, str]]]:
+        batch = self.mcp.call_tool(
+            "read_devdocs_pages",
+            {
+                "pages": [{"doc_slug": page["doc_slug"], "path": page["path"]} for _, page in items],
+                "format": "sections",
+                "transfer": "file",
+            },
+        )
+        if not isinstance(batch, list):
+            return
+        for (tech, page), result in zip(items, batch):
+            sections = result.get("content") if isinstance(result, dict) else None
+            if not isinstance(sections, list):
+                continue
+            for section in sections:
+                if isinstance(section, dict) and section.get("text"):
+                    yield tech, page, section
+
+    def _chunk(self, item: Tuple[str, Dict[str, str], Dict[str, str]]) -> Iterable[Document]:
+        tech, page, section = item
+        anchor = section.get("anchor") or ""
+        url = (page.get("url") or "").split("#")[0]
+        path = page["path"]
+        for n, chunk in enumerate(chunk_text(section["text"])):
+            yield Document(
+                page_content=chunk,
+                metadata={
+                    "source": "devdocs",
+                    "tech": tech,
+                    "doc_slug": page["doc_slug"],
+                    "url": f"{url}#{anchor}" if url and anchor else url,
+                    "path": f"{path}#{anchor}" if anchor else path,
+                    "section": anchor,
+                    "title": section.get("title") or "",
+                    "chunk": n,
+                },
+            )
+
+    def _count(self, docs: Iterable[Document]) -> None:
+        with self._added_lock:
+            for doc in docs:
+                tech = doc.metadata["tech"]
+                self.added[tech] = self.added.get(tech, 0) + 1
+
+    def _embed(self, docs: List[Document]) -> Iterable[Tuple[List[Document], List[List[float]]]]:
+        new_docs = vs_new_documents(docs)
+        if len(new_docs) < len(docs):
+            fresh = {id(doc) for doc in new_docs}
+            self._count(doc for doc in docs if id(doc) not in fresh)
+        if new_docs:
+            yield new_docs, vs_embed_documents(new_docs)
+
+    def _upsert(self, item: Tuple[List[Document], List[List[float]]]) -> Iterable[Document]:
+        docs, vectors = item
+        vs_upsert_embedded(docs, vectors)
+        self._count(docs)
+        return docs
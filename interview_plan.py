@@ -1,9 +1,10 @@
+import asyncio
 import json
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from config import llm
+from config import get_llm
 from helpers import extract_json_array, extract_json_object
-from mcp_client import MCPServerClient
+from mcp_client import AsyncMCPServerClient
 
 
 def generate_topics_for_tech(
@@ -21,7 +22,7 @@ Context: grade={grade}, position={position}, tech={tech}
 Example: ["slices","maps","fmt"]
 """
     try:
-        resp = llm.invoke([("human", prompt)])
+        resp = get_llm().invoke([("human", prompt)])
         arr_text = extract_json_array(resp.content)
         parsed = json.loads(arr_text)
         if isinstance(parsed, list):
@@ -57,7 +58,7 @@ Adaptation (important):
 - The question must stay within IT and be relevant to the role.
 """
     try:
-        resp = llm.invoke([("human", prompt)])
+        resp = get_llm().invoke([("human", prompt)])
         obj = extract_json_object(resp.content)
         parsed = json.loads(obj)
         question = parsed.get("question") if isinstance(parsed, dict) else None
@@ -95,7 +96,7 @@ Return only JSON:
 {{"question": "..."}}
 """
     try:
-        resp = llm.invoke([("human", prompt)])
+        resp = get_llm().invoke([("human", prompt)])
         obj = extract_json_object(resp.content)
         parsed = json.loads(obj)
         question = parsed.get("question") if isinstance(parsed, dict) else None
@@ -106,8 +107,46 @@ Return only JSON:
     return f"Расскажите про вашу роль {position} и ключевые задачи на последних проектах."
 
 
-def generate_interview_plan(
-    mcp: MCPServerClient,
+def _topic_search_calls(tech: str, topics: List[str]) -> List[Tuple[str, dict]]:
+    return [("search_devdocs", {"doc_name": tech, "keyword": topic, "limit": 1}) for topic in topics]
+
+
+def _topics_with_hits(topics: List[str], results: List[Any]) -> List[str]:
+    return [topic for topic, res in zip(topics, results) if res and isinstance(res, list) and len(res) > 0]
+
+
+async def validate_topics(mcp: AsyncMCPServerClient, tech: str, topics: List[str]) -> List[str]:
+    """Keeps topics that have DevDocs hits; all searches are in flight at once on the event loop."""
+    try:
+        results = await mcp.call_tools(_topic_search_calls(tech, topics))
+    except Exception:
+        results = []
+    return _topics_with_hits(topics, results)
+
+
+async def _plan_for_tech(
+    mcp: AsyncMCPServerClient,
+    grade: str,
+    position: str,
+    tech: str,
+    per_tech: int,
+) -> Tuple[List[str], List[Dict[str, str]]]:
+    # LLM calls are blocking and go to threads; DevDocs searches are awaited directly.
+    topics = await asyncio.to_thread(generate_topics_for_tech, grade, position, tech, per_tech)
+    validated = await validate_topics(mcp, tech, topics)
+    if not validated:
+        validated = [tech]
+
+    questions = await asyncio.gather(
+        *(asyncio.to_thread(generate_question_for_tech_topic, grade, position, tech, topic) for topic in validated)
+    )
+    return validated, [
+        {"tech": tech, "topic": topic, "question": question} for topic, question in zip(validated, questions)
+    ]
+
+
+async def generate_interview_plan(
+    mcp: AsyncMCPServerClient,
     grade: str,
     position: str,
     techs: List[str],
@@ -116,23 +155,11 @@ def generate_interview_plan(
     topics_map: Dict[str, List[str]] = {}
     questions_queue: List[Dict[str, str]] = []
 
-    for tech in (techs or []):
-        topics = generate_topics_for_tech(grade, position, tech, max_topics=per_tech)
-        validated: List[str] = []
-        for topic in topics:
-            try:
-                res = mcp.call_tool("search_devdocs", {"doc_name": tech, "keyword": topic})
-            except Exception:
-                res = None
-            if res and isinstance(res, list) and len(res) > 0:
-                validated.append(topic)
-        if not validated:
-            validated = [tech]
+    # Techs are planned concurrently; the queue keeps the order of `techs`.
+    plans = await asyncio.gather(*(_plan_for_tech(mcp, grade, position, tech, per_tech) for tech in (techs or [])))
+    for tech, (validated, questions) in zip(techs or [], plans):
         topics_map[tech] = validated
-
-        for topic in validated:
-            question = generate_question_for_tech_topic(grade, position, tech, topic)
-            questions_queue.append({"tech": tech, "topic": topic, "question": question})
+        questions_queue.extend(questions)
 
     return {"topics_map": topics_map, "questions_queue": questions_queue}
 
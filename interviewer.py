@@ -1,6 +1,6 @@
 import json
 
-from config import llm
+from config import get_llm
 from helpers import extract_json_object
 from models import ObserverResult
 
@@ -67,7 +67,7 @@ CONSTRAINT:
 """
 
     try:
-        resp = llm.invoke([("human", prompt)])
+        resp = get_llm().invoke([("human", prompt)])
         raw = resp.content or ""
         obj_text = extract_json_object(raw)
         parsed = json.loads(obj_text) if obj_text else {}
@@ -0,0 +1,96 @@
+import codecs
+import json
+from typing import Any, Iterable, Iterator, Tuple
+
+_WHITESPACE = " \t\r\n"
+_decoder = json.JSONDecoder()
+
+
+def decode_chunks(chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator[str]:
+    """Incrementally decodes byte chunks (multi-byte characters may span chunk borders)."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def iter_json_object(chunks: Iterable[str]) -> Iterator[Tuple[str, Any]]:
+    """Yields (key, value) pairs of a top-level JSON object read from text chunks.
+
+    Only the current member has to fit in memory, so peak usage is bounded by the
+    largest single value (one DevDocs page) rather than by the whole document.
+    """
+    source = iter(chunks)
+    buf = ""
+    pos = 0
+
+    def fill(min_size: int) -> bool:
+        # Keeps the unread tail and appends chunks until it is at least min_size long.
+        nonlocal buf, pos
+        parts = [buf[pos:]]
+        size = len(parts[0])
+        got = False
+        while size < min_size:
+            chunk = next(source, None)
+            if chunk is None:
+                break
+            parts.append(chunk)
+            size += len(chunk)
+            got = True
+        buf = "".join(parts)
+        pos = 0
+        return got
+
+    def skip_ws() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill(1):
+                return ""
+
+    def parse_value() -> Any:
+        nonlocal pos
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # Most likely the value is cut by the buffer end: read at least as much again.
+                if not fill(max(2 * (len(buf) - pos), 1 << 16)):
+                    raise
+                continue
+            if end == len(buf) and fill(len(buf) - pos + 1):
+                # A number/literal touching the buffer end may continue in the next chunk.
+                continue
+            pos = end
+            return value
+
+    if skip_ws() != "{":
+        raise ValueError("Expected a JSON object")
+    pos += 1
+
+    first = True
+    while True:
+        char = skip_ws()
+        if char == "}":
+            return
+        if not first:
+            if char != ",":
+                raise ValueError(f"Expected ',' or '}}' at offset {pos}")
+            pos += 1
+            skip_ws()
+        key = parse_value()
+        if not isinstance(key, str):
+            raise ValueError("Object keys must be strings")
+        if skip_ws() != ":":
+            raise ValueError(f"Expected ':' after key {key!r}")
+        pos += 1
+        skip_ws()
+        yield key, parse_value()
+        first = False
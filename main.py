@@ -1,8 +1,10 @@
 import asyncio
 import json
+import logging
 import re
 from typing import Any, Dict
 
+from config import MCP_POOL_SIZE, MCP_TRANSPORT, get_llm
 from devdocs_loader import (
     background_load_other_techs,
     load_devdocs_for_tech,
@@ -18,20 +20,35 @@ from interview_plan import (
 )
 from interviewer import build_interviewer_visible_message
 from logger import InterviewLogger
-from mcp_client import MCPServerClient
+from mcp_client import acreate_mcp_client
 from models import QAItem
 from observer import observer_analyze
 from question_generation import ensure_expected_from_rag, make_answerable_question
+from rag_store import get_embeddings, get_vector_store
+from startup import Warmup
 from tech_extraction import extract_tech_slugs_from_user_text
 
 
 async def run_interview():
     safe_print("=== MULTI-AGENT INTERVIEW COACH (Primary-first + Parallel RAG) ===\n")
 
+    # Тяжёлые части (MCP-сервер, LLM-клиент, модель эмбеддингов, Chroma) поднимаются
+    # в фоне, пока кандидат отвечает на первые вопросы анкеты.
+    warmup = Warmup()
+    # MCP-клиент живёт на event loop (asyncio-транспорт), поэтому стартует задачей, а не в потоке.
+    mcp_task = asyncio.create_task(
+        acreate_mcp_client(MCP_TRANSPORT, server_script="server.py", pool_size=MCP_POOL_SIZE)
+    )
+    mcp_task.add_done_callback(lambda _: warmup.mark("mcp"))
+    warmup.start("llm", get_llm)
+    warmup.start("embeddings", get_embeddings)
+    warmup.start("vector_store", get_vector_store)
+
     logger = InterviewLogger(team_name="Скирляк Ярослав Юрьевич", filename="interview_log.json")
-    mcp = MCPServerClient(server_script="server.py")
+    mcp = None
 
     try:
+        logging.info(f"[STARTUP] first prompt after {warmup.mark('first_prompt'):.2f}s")
         name = (await ainput("👤 Имя кандидата (Alex): ")).strip() or "Alex"
         position = (await ainput("💼 Позиция (Backend Developer): ")).strip() or "Backend Developer"
         grade = (await ainput("📊 Уровень (Junior): ")).strip() or "Junior"
@@ -41,6 +58,8 @@ async def run_interview():
         stack_text = (await ainput("\n🔧 Опиши свой стек (можно по-русски): ")).strip()
 
         techs = extract_tech_slugs_from_user_text(stack_text)
+        mcp = await mcp_task
+        logging.info(f"[STARTUP] {warmup.report()}")
         domain_mode = False
         if not techs:
             domain_mode = True
@@ -61,7 +80,7 @@ async def run_interview():
         questions_queue = []
         if not domain_mode:
             safe_print("\n🧭 Генерирую план интервью (темы и начальные вопросы)...")
-            plan = generate_interview_plan(mcp, grade, position, techs, per_tech=3)
+            plan = await generate_interview_plan(mcp, grade, position, techs, per_tech=3)
             topics_map = plan.get("topics_map", {})
             questions_queue = plan.get("questions_queue", [])
             safe_print(f"🔎 План по темам: {topics_map}")
@@ -72,15 +91,9 @@ async def run_interview():
             safe_print(f"\n⏳ Загружаю документацию по первичной технологии: {primary}")
             primary_topics = topics_map.get(primary, [])
             if primary_topics:
-                ok_primary = await asyncio.to_thread(
-                    load_devdocs_for_tech_with_topics,
-                    mcp,
-                    primary,
-                    primary_topics,
-                    3,
-                )
+                ok_primary = await load_devdocs_for_tech_with_topics(mcp, primary, primary_topics, 3)
             else:
-                ok_primary = await asyncio.to_thread(load_devdocs_for_tech, mcp, primary, 3)
+                ok_primary = await load_devdocs_for_tech(mcp, primary, 3)
 
             if ok_primary:
                 loaded_techs.add(primary)
@@ -287,10 +300,17 @@ async def run_interview():
 
 
     finally:
+        if mcp is None:
+            if mcp_task.done() and not mcp_task.cancelled() and mcp_task.exception() is None:
+                mcp = mcp_task.result()
+            else:
+                mcp_task.cancel()
         try:
-            mcp.close()
+            if mcp is not None:
+                await mcp.close()
         except Exception:
             pass
+        warmup.shutdown()
 
 
 if __name__ == "__main__":
@@ -1,19 +1,154 @@
+import asyncio
+import importlib
+import itertools
 import json
+import logging
+import os
 import subprocess
 import sys
 import threading
-from typing import Any, Optional
+import time
+from concurrent.futures import CancelledError, Future, InvalidStateError, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
+from blob_transfer import resolve_blobs
 from helpers import safe_print
 
 
-class MCPServerClient:
-    """Client for local MCP server via stdio (JSON-RPC)."""
-    def __init__(self, server_script: str = "server.py"):
+# Per-tool call deadlines in seconds (None = no deadline); other tools use CALL_TIMEOUT.
+# Page reads may import a whole db.json on first use, and a prefetch downloads many docs
+# (and builds their FTS indexes).
+TOOL_TIMEOUTS: Dict[str, Optional[float]] = {
+    "read_devdocs_page": 180.0,
+    "read_devdocs_pages": 180.0,
+    "prefetch_devdocs": None,
+}
+
+
+def _chain(source: Future, target: Future):
+    error = source.exception()
+    if error is not None:
+        target.set_exception(error)
+    else:
+        target.set_result(source.result())
+
+
+def _tool_timeout(name: str, timeout: Optional[float], default: Optional[float]) -> Optional[float]:
+    if timeout is not None:
+        return timeout
+    return TOOL_TIMEOUTS.get(name, default)
+
+
+def _log_timeout(name: str, error: Exception):
+    safe_print(f"⏱️ [MCP] {name}: {error}")
+    logging.warning(f"[MCP] {name} timed out: {error}")
+
+
+def _parse_tool_response(resp: Optional[dict]) -> Any:
+    if resp and "result" in resp:
+        content = resp["result"]["content"][0]["text"]
+        try:
+            parsed = json.loads(content)
+        except Exception:
+            return content
+        # Large pages may come back as handles to files in the shared cache.
+        return resolve_blobs(parsed)
+    safe_print(f"❌ [MCP] Error/empty: {resp}")
+    return None
+
+
+class _ToolCalls:
+    """Blocking call helpers shared by every transport, built on its `_submit()`.
+
+    Subclasses implement `_submit(name, arguments, timeout) -> Future` resolving to the
+    parsed tool result; timeout logging, per-call error handling and the in-flight
+    count live here so the transports cannot drift apart.
+    """
+
+    def __init__(self):
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+
+    def _submit(self, name: str, arguments: dict, timeout: Optional[float]) -> Future:
+        raise NotImplementedError
+
+    def _finished(self, _future: Future):
+        with self._in_flight_lock:
+            self._in_flight -= 1
+
+    def submit_tool(self, name: str, arguments: dict, timeout: Optional[float] = None) -> Future:
+        """Sends a tool call without waiting; the future resolves to the parsed result.
+
+        `timeout` overrides the tool's deadline from TOOL_TIMEOUTS / the client default.
+        """
+        future = self._submit(name, arguments, timeout)
+        with self._in_flight_lock:
+            self._in_flight += 1
+        future.add_done_callback(self._finished)
+        return future
+
+    def call_tool(self, name: str, arguments: dict, timeout: Optional[float] = None) -> Any:
+        """Thread-safe tool call; returns None if the deadline passes."""
+        try:
+            return self.submit_tool(name, arguments, timeout=timeout).result()
+        except TimeoutError as e:
+            _log_timeout(name, e)
+            return None
+
+    def call_tools(self, calls: List[Tuple[str, dict]], timeout: Optional[float] = None) -> List[Any]:
+        """Sends all calls at once and returns their results in order (None for failed calls)."""
+        futures = [self.submit_tool(name, arguments, timeout=timeout) for name, arguments in calls]
+        results = []
+        for name, future in zip((name for name, _ in calls), futures):
+            try:
+                results.append(future.result())
+            except TimeoutError as e:
+                _log_timeout(name, e)
+                results.append(None)
+            except Exception:
+                results.append(None)
+        return results
+
+    @property
+    def outstanding(self) -> int:
+        """Calls submitted through this client that have not resolved yet."""
+        return self._in_flight
+
+
+class MCPServerClient(_ToolCalls):
+    """Client for local MCP server via stdio (JSON-RPC).
+
+    A reader thread routes responses by request id to per-call futures,
+    so any number of threads can have tool calls in flight at once.
+    Every call has a deadline; a dead or wedged server is restarted and
+    re-initialized on the next call.
+    """
+
+    CALL_TIMEOUT = 30.0
+    # No output for this long since a pending call was sent => server is wedged.
+    # Calls allowed to run longer than this (see TOOL_TIMEOUTS) do not count as pending here.
+    WEDGE_TIMEOUT = 90.0
+    WATCHDOG_INTERVAL = 0.5
+
+    def __init__(self, server_script: str = "server.py", call_timeout: Optional[float] = None):
+        super().__init__()
         self.server_script = server_script
+        self.call_timeout = self.CALL_TIMEOUT if call_timeout is None else call_timeout
         self.process: Optional[subprocess.Popen] = None
-        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._restart_lock = threading.RLock()
+        self._pending: Dict[int, Future] = {}
+        self._deadlines: Dict[int, float] = {}
+        self._long_calls: set = set()
+        self._pending_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._closed = threading.Event()
+        self._shutdown = threading.Event()
+        self._last_activity = time.monotonic()
+        # Send time of the first call still unanswered since the last output (None = none).
+        self._unanswered_since: Optional[float] = None
         self._start_server()
+        threading.Thread(target=self._watchdog, name="mcp-watchdog", daemon=True).start()
 
     def _start_server(self):
         safe_print(f"🔌 [MCP] Starting server: {self.server_script}")
@@ -26,20 +161,33 @@ class MCPServerClient:
             encoding="utf-8",
             bufsize=1,
         )
-        self._send_request(
+        # Each process gets its own pending map and closed flag, so a reader
+        # that exits after a restart only fails the calls sent to its process.
+        self._pending = {}
+        self._closed = threading.Event()
+        self._last_activity = time.monotonic()
+        self._unanswered_since = None
+        threading.Thread(
+            target=self._read_loop,
+            args=(self.process, self._pending, self._closed),
+            name="mcp-reader",
+            daemon=True,
+        ).start()
+        threading.Thread(target=self._drain_stderr, args=(self.process,), name="mcp-stderr", daemon=True).start()
+        init = self._request(
             "initialize",
             {
                 "protocolVersion": "2024-11-05",
                 "capabilities": {},
                 "clientInfo": {"name": "agent", "version": "1.0"},
             },
-            msg_id=0,
+            timeout=self.call_timeout,
         )
-        _ = self._read_response()
+        init.result(timeout=self.call_timeout)
         self._send_request("notifications/initialized", {}, msg_id=None)
         safe_print("✅ [MCP] Ready.")
 
-    def _send_request(self, method: str, params: dict, msg_id: Optional[int] = 1):
+    def _send_request(self, method: str, params: dict, msg_id: Optional[int] = None):
         if not self.process or not self.process.stdin:
             raise RuntimeError("MCP process not started")
         req = {"jsonrpc": "2.0", "method": method, "params": params}
@@ -47,41 +195,582 @@ class MCPServerClient:
             req["id"] = msg_id
 
         json_str = json.dumps(req, ensure_ascii=False)
-        self.process.stdin.write(json_str + "\n")
-        self.process.stdin.flush()
+        with self._write_lock:
+            self.process.stdin.write(json_str + "\n")
+            self.process.stdin.flush()
 
-    def _read_response(self) -> Optional[dict]:
-        if not self.process or not self.process.stdout:
-            return None
-        while True:
-            line = self.process.stdout.readline()
-            if not line:
-                return None
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                return json.loads(line)
-            except Exception:
-                continue
+    def _request(self, method: str, params: dict, timeout: Optional[float] = None) -> Future:
+        msg_id = next(self._ids)
+        future: Future = Future()
+        with self._pending_lock:
+            pending = self._pending
+            pending[msg_id] = future
+            if timeout:
+                self._deadlines[msg_id] = time.monotonic() + timeout
+            if not timeout or timeout > self.WEDGE_TIMEOUT:
+                self._long_calls.add(msg_id)
+            elif self._unanswered_since is None:
+                self._unanswered_since = time.monotonic()
+        try:
+            self._send_request(method, params, msg_id=msg_id)
+        except Exception as e:
+            with self._pending_lock:
+                pending.pop(msg_id, None)
+                self._deadlines.pop(msg_id, None)
+                self._long_calls.discard(msg_id)
+            future.set_exception(e)
+        return future
 
-    def call_tool(self, name: str, arguments: dict) -> Any:
-        with self._lock:
-            self._send_request("tools/call", {"name": name, "arguments": arguments}, msg_id=1)
-            resp = self._read_response()
+    def _read_loop(self, process: subprocess.Popen, pending: Dict[int, Future], closed: threading.Event):
+        stdout = process.stdout
+        try:
+            while stdout:
+                line = stdout.readline()
+                if not line:
+                    break
+                self._last_activity = time.monotonic()
+                self._unanswered_since = None
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    msg = json.loads(line)
+                except Exception:
+                    continue
+                if not isinstance(msg, dict) or "method" in msg:
+                    continue
+                with self._pending_lock:
+                    future = pending.pop(msg.get("id"), None)
+                    self._deadlines.pop(msg.get("id"), None)
+                    self._long_calls.discard(msg.get("id"))
+                if future and not future.done():
+                    future.set_result(msg)
+        finally:
+            closed.set()
+            self._fail_pending(pending, RuntimeError("MCP server closed the connection"))
+
+    def _drain_stderr(self, process: subprocess.Popen):
+        # An undrained stderr PIPE fills up and blocks the server mid-write.
+        try:
+            for line in process.stderr:
+                line = line.rstrip()
+                if line:
+                    logging.info(f"[MCP stderr] {line}")
+        except Exception:
+            pass
+
+    def _fail_pending(self, pending: Dict[int, Future], error: Exception):
+        with self._pending_lock:
+            futures = list(pending.values())
+            for msg_id in pending:
+                self._deadlines.pop(msg_id, None)
+                self._long_calls.discard(msg_id)
+            pending.clear()
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    def _watchdog(self):
+        while not self._shutdown.wait(self.WATCHDOG_INTERVAL):
+            now = time.monotonic()
+            with self._pending_lock:
+                expired = [msg_id for msg_id, deadline in self._deadlines.items() if deadline <= now]
+                futures = []
+                for msg_id in expired:
+                    self._deadlines.pop(msg_id, None)
+                    self._long_calls.discard(msg_id)
+                    future = self._pending.pop(msg_id, None)
+                    if future:
+                        futures.append((msg_id, future))
+                busy = any(msg_id not in self._long_calls for msg_id in self._pending)
+                # Silence is measured from the later of the last output and the first call
+                # sent after it, so a call made after a long idle spell gets the full
+                # WEDGE_TIMEOUT; once nothing is waiting (calls answered or cancelled) the
+                # next call starts afresh.
+                if busy or futures:
+                    waiting_since = self._unanswered_since or self._last_activity
+                else:
+                    self._unanswered_since = None
+                    waiting_since = None
+            for msg_id, future in futures:
+                self._notify_cancelled(msg_id, "timeout")
+                if not future.done():
+                    future.set_exception(TimeoutError(f"MCP call {msg_id} exceeded its deadline"))
+            if waiting_since is not None and now - waiting_since > self.WEDGE_TIMEOUT:
+                safe_print("⚠️ [MCP] Server is not responding, restarting")
+                try:
+                    self.restart()
+                except Exception as e:
+                    logging.info(f"[MCP] Restart failed: {e}")
+
+    def _notify_cancelled(self, msg_id: int, reason: str):
+        try:
+            self._send_request("notifications/cancelled", {"requestId": msg_id, "reason": reason}, msg_id=None)
+        except Exception:
+            pass
+
+    def _ensure_alive(self):
+        if not self.is_alive() and not self._shutdown.is_set():
+            with self._restart_lock:
+                if not self.is_alive():
+                    self.restart()
+
+    def restart(self):
+        """Kills the server process, fails its in-flight calls and starts a fresh, initialized one."""
+        with self._restart_lock:
+            old = self.process
+            self._fail_pending(self._pending, RuntimeError("MCP server restarted"))
+            if old and old.poll() is None:
+                try:
+                    old.kill()
+                except Exception:
+                    pass
+            self._start_server()
+
+    def cancel_all(self, reason: str = "cancelled"):
+        """Fails every outstanding call and tells the server to drop them."""
+        with self._pending_lock:
+            ids = list(self._pending)
+        for msg_id in ids:
+            self._notify_cancelled(msg_id, reason)
+        self._fail_pending(self._pending, CancelledError(reason))
 
-        if resp and "result" in resp:
-            content = resp["result"]["content"][0]["text"]
+    def _submit(self, name: str, arguments: dict, timeout: Optional[float]) -> Future:
+        self._ensure_alive()
+        raw = self._request(
+            "tools/call",
+            {"name": name, "arguments": arguments},
+            timeout=_tool_timeout(name, timeout, self.call_timeout),
+        )
+        result: Future = Future()
+
+        def _done(fut: Future):
+            if fut.exception() is not None:
+                _chain(fut, result)
+                return
+            # The callback runs on the reader/watchdog thread: a parse or blob-read
+            # error must still resolve `result`, or call_tool() waits forever.
             try:
-                return json.loads(content)
-            except Exception:
-                return content
-        safe_print(f"❌ [MCP] Error/empty: {resp}")
-        return None
+                parsed = _parse_tool_response(fut.result())
+            except Exception as e:
+                result.set_exception(e)
+            else:
+                result.set_result(parsed)
+
+        raw.add_done_callback(_done)
+        return result
+
+    def is_alive(self) -> bool:
+        return bool(self.process and self.process.poll() is None and not self._closed.is_set())
 
     def close(self):
+        self._shutdown.set()
+        self.cancel_all("client closed")
         try:
             if self.process:
                 self.process.terminate()
         except Exception:
             pass
+
+
+class MCPServerPool(_ToolCalls):
+    """N server processes behind the MCPServerClient interface.
+
+    Calls go to the worker with the fewest outstanding requests; dead workers
+    are restarted on the next call and a call lost with its worker is retried once.
+    """
+
+    def __init__(self, server_script: str = "server.py", size: Optional[int] = None):
+        super().__init__()
+        self.server_script = server_script
+        self.size = max(1, size or min(4, os.cpu_count() or 1))
+        self._lock = threading.Lock()
+        self._restarting: set = set()
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            self.workers: List[MCPServerClient] = list(
+                executor.map(lambda _: MCPServerClient(server_script), range(self.size))
+            )
+
+    def _restart(self, index: int):
+        safe_print(f"♻️ [MCP] Worker {index} is dead, restarting")
+        try:
+            self.workers[index].restart()
+        finally:
+            with self._lock:
+                self._restarting.discard(index)
+
+    def _pick(self) -> MCPServerClient:
+        # Dead workers are claimed under the lock but restarted outside it: a restart
+        # spawns a process and fails its pending calls, whose callbacks may re-enter here.
+        with self._lock:
+            dead = [
+                i for i, worker in enumerate(self.workers)
+                if i not in self._restarting and not worker.is_alive()
+            ]
+            self._restarting.update(dead)
+        for i in dead:
+            self._restart(i)
+        with self._lock:
+            ready = [worker for i, worker in enumerate(self.workers) if i not in self._restarting]
+        return min(ready or self.workers, key=lambda worker: worker.outstanding)
+
+    def _submit(self, name: str, arguments: dict, timeout: Optional[float], retries: int = 1) -> Future:
+        worker = self._pick()
+        inner = worker.submit_tool(name, arguments, timeout=timeout)
+        result: Future = Future()
+
+        def _done(fut: Future):
+            # RuntimeError = the worker died or was restarted under this call.
+            if isinstance(fut.exception(), RuntimeError) and retries > 0:
+                # Not on this thread: it may be the dying worker's reader or a restart in _pick.
+                threading.Thread(target=_retry, name="mcp-pool-retry", daemon=True).start()
+            else:
+                _chain(fut, result)
+
+        def _retry():
+            try:
+                retry = self._submit(name, arguments, timeout, retries=retries - 1)
+            except Exception as e:
+                result.set_exception(e)
+            else:
+                retry.add_done_callback(lambda r: _chain(r, result))
+
+        inner.add_done_callback(_done)
+        return result
+
+    def close(self):
+        for worker in self.workers:
+            worker.close()
+
+
+class InProcessMCPClient(_ToolCalls):
+    """MCPServerClient interface over server.py's tool implementations in this process.
+
+    No subprocess and no JSON: results come back as the same Python objects the
+    stdio client would get after parsing. Intended for single-host runs and benchmarks.
+    """
+
+    def __init__(self, server_module: str = "server", max_workers: int = 8):
+        super().__init__()
+        self._server = importlib.import_module(server_module)
+        self._tools = self._server.TOOL_IMPLS
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcp-inproc")
+
+    def _invoke(self, name: str, arguments: dict) -> Any:
+        tool = self._tools.get(name)
+        if tool is None:
+            safe_print(f"❌ [MCP] Unknown tool: {name}")
+            return None
+        return resolve_blobs(tool(**arguments))
+
+    def _submit(self, name: str, arguments: dict, timeout: Optional[float]) -> Future:
+        """Same deadlines as MCPServerClient: the future fails with TimeoutError when the call
+        outlives it (the worker thread itself cannot be interrupted and finishes in the background)."""
+        inner = self._executor.submit(self._invoke, name, arguments)
+        deadline = _tool_timeout(name, timeout, MCPServerClient.CALL_TIMEOUT)
+        if not deadline:
+            return inner
+        result: Future = Future()
+
+        def _expire():
+            try:
+                result.set_exception(TimeoutError(f"in-process call {name} exceeded its deadline"))
+            except InvalidStateError:
+                pass
+
+        def _done(fut: Future):
+            timer.cancel()
+            try:
+                _chain(fut, result)
+            except InvalidStateError:
+                pass
+
+        timer = threading.Timer(deadline, _expire)
+        timer.daemon = True
+        timer.start()
+        inner.add_done_callback(_done)
+        return result
+
+    def is_alive(self) -> bool:
+        return True
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+class _LoopBoundCalls(_ToolCalls):
+    """Blocking view of an AsyncMCPServerClient for worker threads (e.g. IngestPipeline stages).
+
+    Each call is scheduled on the client's event loop, so the caller must not be that loop.
+    """
+
+    def __init__(self, client: "AsyncMCPServerClient"):
+        super().__init__()
+        self._client = client
+
+    def _submit(self, name: str, arguments: dict, timeout: Optional[float]) -> Future:
+        return asyncio.run_coroutine_threadsafe(self._client._call(name, arguments, timeout), self._client.loop)
+
+
+class _AsyncToolCalls:
+    """Awaitable call helpers shared by the async clients, built on their `_call()`.
+
+    `_call(name, arguments, timeout)` returns the parsed result or raises (TimeoutError
+    when the deadline passes); `blocking()` gives a _ToolCalls client for threads.
+    """
+
+    async def _call(self, name: str, arguments: dict, timeout: Optional[float]) -> Any:
+        raise NotImplementedError
+
+    def blocking(self) -> _ToolCalls:
+        raise NotImplementedError
+
+    async def call_tool(self, name: str, arguments: dict, timeout: Optional[float] = None) -> Any:
+        """Awaits one tool call; returns None if the deadline passes."""
+        try:
+            return await self._call(name, arguments, timeout)
+        except TimeoutError as e:
+            _log_timeout(name, e)
+            return None
+
+    async def call_tools(
+        self,
+        calls: List[Tuple[str, dict]],
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> List[Any]:
+        """Runs the calls concurrently (at most `concurrency` in flight if given); None for failed calls."""
+        semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+
+        async def _one(name: str, arguments: dict) -> Any:
+            try:
+                if semaphore is None:
+                    return await self.call_tool(name, arguments, timeout=timeout)
+                async with semaphore:
+                    return await self.call_tool(name, arguments, timeout=timeout)
+            except Exception:
+                return None
+
+        return list(await asyncio.gather(*(_one(name, arguments) for name, arguments in calls)))
+
+    async def close(self):
+        raise NotImplementedError
+
+
+class AsyncMCPServerClient(_AsyncToolCalls):
+    """Asyncio client for the local MCP server (subprocess streams, no thread per call).
+
+    Usage: ``client = await AsyncMCPServerClient.start("server.py")``, then
+    ``await client.call_tool(...)`` / ``await client.call_tools([...], concurrency=N)``.
+    Deadlines follow TOOL_TIMEOUTS like MCPServerClient; a dead server is restarted
+    on the next call.
+    """
+
+    # A single JSON-RPC line may carry a whole page of HTML.
+    STREAM_LIMIT = 64 * 1024 * 1024
+
+    def __init__(self, server_script: str = "server.py", call_timeout: Optional[float] = None):
+        self.server_script = server_script
+        self.call_timeout = MCPServerClient.CALL_TIMEOUT if call_timeout is None else call_timeout
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._tasks: List[asyncio.Task] = []
+        self._restart_lock = asyncio.Lock()
+        self._closed = False
+
+    @classmethod
+    async def start(cls, server_script: str = "server.py", call_timeout: Optional[float] = None) -> "AsyncMCPServerClient":
+        client = cls(server_script, call_timeout=call_timeout)
+        await client._start_server()
+        return client
+
+    async def __aenter__(self) -> "AsyncMCPServerClient":
+        if self.process is None:
+            await self._start_server()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _start_server(self):
+        self.loop = asyncio.get_running_loop()
+        safe_print(f"🔌 [MCP] Starting async server: {self.server_script}")
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            self.server_script,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=self.STREAM_LIMIT,
+        )
+        # As in MCPServerClient, each process has its own pending map, so a reader
+        # that exits after a restart only fails the calls sent to its process.
+        self._pending = {}
+        self._tasks = [
+            asyncio.create_task(self._read_loop(self.process, self._pending)),
+            asyncio.create_task(self._drain_stderr(self.process)),
+        ]
+        await self._request(
+            "initialize",
+            {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {},
+                "clientInfo": {"name": "agent", "version": "1.0"},
+            },
+            timeout=self.call_timeout,
+        )
+        await self._send_request("notifications/initialized", {}, msg_id=None)
+        safe_print("✅ [MCP] Ready (async).")
+
+    async def _send_request(self, method: str, params: dict, msg_id: Optional[int] = None):
+        if not self.process or not self.process.stdin:
+            raise RuntimeError("MCP process not started")
+        req = {"jsonrpc": "2.0", "method": method, "params": params}
+        if msg_id is not None:
+            req["id"] = msg_id
+        # Single write per message, so concurrent calls never interleave lines.
+        self.process.stdin.write((json.dumps(req, ensure_ascii=False) + "\n").encode("utf-8"))
+        await self.process.stdin.drain()
+
+    async def _request(self, method: str, params: dict, timeout: Optional[float] = None) -> dict:
+        msg_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending
+        pending[msg_id] = future
+        try:
+            await self._send_request(method, params, msg_id=msg_id)
+            try:
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                await self._notify_cancelled(msg_id, "timeout")
+                raise TimeoutError(f"MCP call {msg_id} exceeded its deadline") from None
+        finally:
+            pending.pop(msg_id, None)
+
+    async def _notify_cancelled(self, msg_id: int, reason: str):
+        try:
+            await self._send_request("notifications/cancelled", {"requestId": msg_id, "reason": reason}, msg_id=None)
+        except Exception:
+            pass
+
+    async def _read_loop(self, process: asyncio.subprocess.Process, pending: Dict[int, asyncio.Future]):
+        try:
+            while process.stdout:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    msg = json.loads(line)
+                except Exception:
+                    continue
+                if not isinstance(msg, dict) or "method" in msg:
+                    continue
+                future = pending.get(msg.get("id"))
+                if future and not future.done():
+                    future.set_result(msg)
+        finally:
+            error = RuntimeError("MCP server closed the connection")
+            for future in list(pending.values()):
+                if not future.done():
+                    future.set_exception(error)
+
+    async def _drain_stderr(self, process: asyncio.subprocess.Process):
+        # An undrained stderr PIPE fills up and blocks the server mid-write.
+        while process.stderr:
+            line = await process.stderr.readline()
+            if not line:
+                break
+            line = line.decode("utf-8", "replace").rstrip()
+            if line:
+                logging.info(f"[MCP stderr] {line}")
+
+    def is_alive(self) -> bool:
+        return bool(
+            self.process
+            and self.process.returncode is None
+            and self._tasks
+            and not self._tasks[0].done()
+        )
+
+    async def _stop_process(self):
+        process, tasks = self.process, self._tasks
+        try:
+            if process and process.returncode is None:
+                process.kill()
+                await process.wait()
+        except Exception:
+            pass
+        for task in tasks:
+            task.cancel()
+
+    async def _ensure_alive(self):
+        if self.is_alive() or self._closed:
+            return
+        async with self._restart_lock:
+            if not self.is_alive():
+                safe_print("♻️ [MCP] Server is dead, restarting")
+                await self._stop_process()
+                await self._start_server()
+
+    async def _call(self, name: str, arguments: dict, timeout: Optional[float]) -> Any:
+        await self._ensure_alive()
+        resp = await self._request(
+            "tools/call",
+            {"name": name, "arguments": arguments},
+            timeout=_tool_timeout(name, timeout, self.call_timeout),
+        )
+        return _parse_tool_response(resp)
+
+    def blocking(self) -> _ToolCalls:
+        return _LoopBoundCalls(self)
+
+    @property
+    def outstanding(self) -> int:
+        return len(self._pending)
+
+    async def close(self):
+        self._closed = True
+        await self._stop_process()
+
+
+class AsyncToolClient(_AsyncToolCalls):
+    """Awaitable interface over a thread-based client (MCPServerClient, MCPServerPool,
+    InProcessMCPClient): calls are awaited through their futures, not worker threads."""
+
+    def __init__(self, client: _ToolCalls):
+        self.client = client
+
+    async def _call(self, name: str, arguments: dict, timeout: Optional[float]) -> Any:
+        return await asyncio.wrap_future(self.client.submit_tool(name, arguments, timeout=timeout))
+
+    def blocking(self) -> _ToolCalls:
+        return self.client
+
+    @property
+    def outstanding(self) -> int:
+        return self.client.outstanding
+
+    async def close(self):
+        self.client.close()
+
+
+def create_mcp_client(transport: str = "stdio", server_script: str = "server.py", pool_size: int = 1):
+    """'inprocess' -> InProcessMCPClient; 'stdio' -> MCPServerClient, or MCPServerPool when pool_size > 1."""
+    if transport == "inprocess":
+        return InProcessMCPClient(server_module=os.path.splitext(os.path.basename(server_script))[0])
+    if pool_size > 1:
+        return MCPServerPool(server_script=server_script, size=pool_size)
+    return MCPServerClient(server_script=server_script)
+
+
+async def acreate_mcp_client(
+    transport: str = "asyncio", server_script: str = "server.py", pool_size: int = 1
+) -> _AsyncToolCalls:
+    """'asyncio' -> AsyncMCPServerClient; other transports as in create_mcp_client(), behind AsyncToolClient."""
+    if transport == "asyncio":
+        return await AsyncMCPServerClient.start(server_script)
+    return AsyncToolClient(await asyncio.to_thread(create_mcp_client, transport, server_script, pool_size))
@@ -0,0 +1,122 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+class _Partition:
+    """Vectors of one tech in a growable float32 buffer.
+
+    Readers take `snapshot()` — (matrix, docs) for rows [0, n) — and never see a partially
+    written batch: rows are filled first and the new count is published with one assignment.
+    """
+
+    def __init__(self, dim: int, capacity: int = 256):
+        self._buffer = np.empty((capacity, dim), dtype=np.float32)
+        self._docs: List[Document] = []
+        self._view: Tuple[np.ndarray, List[Document]] = (self._buffer[:0], [])
+
+    def snapshot(self) -> Tuple[np.ndarray, List[Document]]:
+        return self._view
+
+    def append(self, vectors: np.ndarray, docs: List[Document]):
+        n = len(self._docs)
+        needed = n + len(docs)
+        buffer = self._buffer
+        if needed > len(buffer):
+            buffer = np.empty((max(needed, 2 * len(buffer)), buffer.shape[1]), dtype=np.float32)
+            buffer[:n] = self._buffer[:n]
+        buffer[n:needed] = vectors
+        docs_list = self._docs + docs
+        self._buffer = buffer
+        self._docs = docs_list
+        self._view = (buffer[:needed], docs_list)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    if k >= len(scores):
+        return np.argsort(-scores)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+class NumpyVectorIndex:
+    """In-memory vector index partitioned by the `tech` metadata of documents.
+
+    Vectors are L2-normalized float32, so a search is one matrix-vector product (cosine
+    similarity) over the tech's partition plus argpartition for the exact top-k.
+    """
+
+    def __init__(self):
+        self._partitions: Dict[str, _Partition] = {}
+        # Ids are deduplicated per partition: the same document may be indexed under several techs.
+        self._ids: Dict[str, set] = {}
+        self._dim: Optional[int] = None
+        self._write_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in list(self._ids.values()))
+
+    def existing_ids(self, ids: Iterable[str], tech: Optional[str] = None) -> set:
+        """Ids already indexed under `tech`, or under any tech when it is None."""
+        if tech is not None:
+            known = self._ids.get(tech, set())
+            return {key for key in ids if key in known}
+        partitions = list(self._ids.values())
+        return {key for key in ids if any(key in known for known in partitions)}
+
+    def add(self, ids: Sequence[str], docs: Sequence[Document], vectors: Sequence[Sequence[float]]):
+        """Adds documents not yet indexed under their tech (by id); documents without a tech go to the '' partition."""
+        if not docs:
+            return
+        matrix = _normalize(np.asarray(vectors, dtype=np.float32))
+        with self._write_lock:
+            if self._dim is None:
+                self._dim = matrix.shape[1]
+            elif matrix.shape[1] != self._dim:
+                raise ValueError(f"vector size {matrix.shape[1]} != index size {self._dim}")
+            rows: Dict[str, List[int]] = {}
+            for i, (key, doc) in enumerate(zip(ids, docs)):
+                tech = (doc.metadata or {}).get("tech") or ""
+                known = self._ids.setdefault(tech, set())
+                if key in known:
+                    continue
+                known.add(key)
+                rows.setdefault(tech, []).append(i)
+            for tech, indexes in rows.items():
+                partition = self._partitions.get(tech)
+                if partition is None:
+                    partition = _Partition(self._dim)
+                partition.append(matrix[indexes], [docs[i] for i in indexes])
+                self._partitions[tech] = partition
+
+    def search(self, query_vector: Sequence[float], k: int, tech: Optional[str] = None) -> List[Document]:
+        """Exact top-k by cosine similarity, within one tech's partition or across all of them."""
+        if k <= 0 or self._dim is None:
+            return []
+        query = _normalize(np.asarray(query_vector, dtype=np.float32))
+        if tech is not None:
+            partition = self._partitions.get(tech)
+            if partition is None:
+                return []
+            matrix, docs = partition.snapshot()
+            if not len(docs):
+                return []
+            return [docs[i] for i in _top_k(matrix @ query, k)]
+
+        best: List[Tuple[float, Document]] = []
+        for partition in list(self._partitions.values()):
+            matrix, docs = partition.snapshot()
+            if not len(docs):
+                continue
+            scores = matrix @ query
+            best.extend((float(scores[i]), docs[i]) for i in _top_k(scores, k))
+        best.sort(key=lambda item: -item[0])
+        return [doc for _, doc in best[:k]]
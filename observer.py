@@ -1,6 +1,6 @@
 import json
 
-from config import llm
+from config import get_llm
 from helpers import extract_json_object, safe_print
 from models import ObserverResult, QAItem
 from question_generation import debug_block
@@ -72,7 +72,7 @@ Correctness rules:
 - low: incorrect or no substantive answer
 
 """
-    resp = llm.invoke([("human", prompt)])
+    resp = get_llm().invoke([("human", prompt)])
     raw = resp.content
     obj = extract_json_object(raw)
 
@@ -0,0 +1,339 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import devdocs_http
+from html_text import clean_html
+from json_stream import decode_chunks, iter_json_object
+
+DEVDOCS_CACHE_DIR = os.environ.get("DEVDOCS_CACHE_DIR", ".devdocs_cache")
+# Pages per INSERT batch while streaming a db.json into the store.
+IMPORT_BATCH = 200
+# An import claim not refreshed for this long is treated as left by a dead process.
+IMPORT_CLAIM_STALE = 600.0
+IMPORT_CLAIM_POLL = 0.2
+
+
+_FTS_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class PageStoreError(Exception):
+    pass
+
+
+def _owner_alive(owner: str) -> bool:
+    """Whether the process named in an import claim ("pid:thread") still runs; assumed alive
+    where that cannot be checked without side effects (os.kill(pid, 0) terminates on Windows)."""
+    if os.name == "nt":
+        return True
+    try:
+        os.kill(int(owner.split(":")[0]), 0)
+    except ProcessLookupError:
+        return False
+    except (OSError, ValueError):
+        return True
+    return True
+
+
+class PageStore:
+    """Local copy of DevDocs db.json files: one SQLite row per (slug, path)."""
+
+    def __init__(self, base_url: str, cache_dir: str = DEVDOCS_CACHE_DIR, offline: bool = False):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.base_url = base_url
+        self.offline = offline
+        self.db_path = os.path.join(cache_dir, "pages.sqlite3")
+        self._local = threading.local()
+        self._loaded = set()
+        self._slug_locks: Dict[str, threading.Lock] = {}
+        self._slug_locks_guard = threading.Lock()
+        self._init_schema()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS docs ("
+                " slug TEXT PRIMARY KEY,"
+                " pages INTEGER NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " etag TEXT NOT NULL DEFAULT '',"
+                " last_modified TEXT NOT NULL DEFAULT '')"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(docs)")}
+            for column in ("etag", "last_modified"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE docs ADD COLUMN {column} TEXT NOT NULL DEFAULT ''")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " slug TEXT NOT NULL,"
+                " path TEXT NOT NULL,"
+                " html TEXT NOT NULL,"
+                " PRIMARY KEY (slug, path))"
+            )
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5("
+                " slug UNINDEXED, path UNINDEXED, title, body,"
+                " tokenize = 'porter unicode61')"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS fts_docs ("
+                " slug TEXT PRIMARY KEY,"
+                " built_at REAL NOT NULL)"
+            )
+            # One row per import in progress; several server processes share the database.
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS imports ("
+                " slug TEXT PRIMARY KEY,"
+                " owner TEXT NOT NULL,"
+                " claimed_at REAL NOT NULL)"
+            )
+
+    def _slug_lock(self, slug: str) -> threading.Lock:
+        with self._slug_locks_guard:
+            lock = self._slug_locks.get(slug)
+            if lock is None:
+                lock = self._slug_locks[slug] = threading.Lock()
+            return lock
+
+    def _claim(self, key: str) -> bool:
+        """Takes the cross-process import claim for `key`; False while another live owner holds it."""
+        conn = self._conn()
+        owner = f"{os.getpid()}:{threading.get_ident()}"
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT owner, claimed_at FROM imports WHERE slug = ?", (key,)).fetchone()
+            if row and time.time() - row[1] < IMPORT_CLAIM_STALE and _owner_alive(row[0]):
+                conn.execute("COMMIT")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO imports (slug, owner, claimed_at) VALUES (?, ?, ?)",
+                (key, owner, time.time()),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return True
+
+    def _release(self, key: str):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM imports WHERE slug = ?", (key,))
+
+    def _exclusive(self, key: str, work: Callable[[], Any], done: Callable[[], bool]) -> Any:
+        """Runs `work` while holding the claim for `key`; returns None without running it if
+        `done()` becomes true while waiting for another process's claim."""
+        while not self._claim(key):
+            time.sleep(IMPORT_CLAIM_POLL)
+            if done():
+                return None
+        try:
+            if done():
+                return None
+            return work()
+        finally:
+            self._release(key)
+
+    def has_doc(self, slug: str) -> bool:
+        if slug in self._loaded:
+            return True
+        row = self._conn().execute("SELECT 1 FROM docs WHERE slug = ?", (slug,)).fetchone()
+        if row:
+            self._loaded.add(slug)
+        return bool(row)
+
+    def ensure_doc(self, slug: str) -> None:
+        """Downloads db.json for the slug once; later calls are a set lookup."""
+        if self.has_doc(slug):
+            return
+        with self._slug_lock(slug):
+            if self.has_doc(slug):
+                return
+            self._exclusive(slug, lambda: self._download(slug), lambda: self.has_doc(slug))
+
+    def _download(self, slug: str, etag: str = "", last_modified: str = "") -> bool:
+        """Streams db.json straight into the store; False if the server answered 304 Not Modified.
+
+        The body is parsed incrementally and spilled in IMPORT_BATCH-sized batches, so memory
+        stays bounded by a batch of pages no matter how large the documentation database is.
+        """
+        if self.offline:
+            raise PageStoreError(f"Документация '{slug}' отсутствует в офлайн-бандле.")
+        db_url = f"{self.base_url}/docs/{slug}/db.json"
+        response = devdocs_http.get(db_url, timeout=10, etag=etag, last_modified=last_modified, stream=True)
+        with response:
+            if response.status_code == 304 and (etag or last_modified):
+                return False
+            if response.status_code != 200:
+                raise PageStoreError(f"Ошибка загрузки базы данных: {response.status_code}")
+            records = iter_json_object(decode_chunks(response.iter_content(chunk_size=1 << 16)))
+            self.import_records(
+                slug,
+                records,
+                response.headers.get("ETag", ""),
+                response.headers.get("Last-Modified", ""),
+            )
+        return True
+
+    def refresh_doc(self, slug: str) -> bool:
+        """Conditional re-download of a stored doc; True if its pages changed."""
+        if not self.has_doc(slug):
+            self.ensure_doc(slug)
+            return True
+        with self._slug_lock(slug):
+            return self._exclusive(slug, lambda: self._refresh(slug), lambda: False)
+
+    def _refresh(self, slug: str) -> bool:
+        conn = self._conn()
+        row = conn.execute("SELECT etag, last_modified FROM docs WHERE slug = ?", (slug,)).fetchone()
+        etag, last_modified = row or ("", "")
+        if self._download(slug, etag, last_modified):
+            return True
+        with conn:
+            conn.execute("UPDATE docs SET fetched_at = ? WHERE slug = ?", (time.time(), slug))
+        return False
+
+    def import_doc(self, slug: str, db_data: Dict[str, str], etag: str = "", last_modified: str = "") -> int:
+        return self.import_records(slug, db_data.items(), etag, last_modified)
+
+    def import_records(
+        self,
+        slug: str,
+        records: Iterable[Tuple[str, Any]],
+        etag: str = "",
+        last_modified: str = "",
+    ) -> int:
+        """Replaces the pages of `slug` with (path, html) records, committing in batches.
+
+        The docs row is written last, so a doc only counts as present once fully imported.
+        """
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM docs WHERE slug = ?", (slug,))
+            conn.execute("DELETE FROM pages WHERE slug = ?", (slug,))
+            conn.execute("DELETE FROM pages_fts WHERE slug = ?", (slug,))
+            conn.execute("DELETE FROM fts_docs WHERE slug = ?", (slug,))
+        self._loaded.discard(slug)
+
+        batch: List[Tuple[str, str, str]] = []
+        try:
+            for path, html in records:
+                if isinstance(html, str):
+                    batch.append((slug, path, html))
+                if len(batch) >= IMPORT_BATCH:
+                    with conn:
+                        conn.executemany("INSERT OR REPLACE INTO pages (slug, path, html) VALUES (?, ?, ?)", batch)
+                        # Keeps the import claim fresh on very large docs.
+                        conn.execute("UPDATE imports SET claimed_at = ? WHERE slug = ?", (time.time(), slug))
+                    batch = []
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO pages (slug, path, html) VALUES (?, ?, ?)", batch)
+                count = conn.execute("SELECT COUNT(*) FROM pages WHERE slug = ?", (slug,)).fetchone()[0]
+                conn.execute(
+                    "INSERT OR REPLACE INTO docs (slug, pages, fetched_at, etag, last_modified) VALUES (?, ?, ?, ?, ?)",
+                    (slug, count, time.time(), etag, last_modified),
+                )
+        except Exception:
+            with conn:
+                conn.execute("DELETE FROM pages WHERE slug = ?", (slug,))
+            raise
+        self._loaded.add(slug)
+        return count
+
+    def get_page(self, slug: str, path: str) -> Optional[str]:
+        self.ensure_doc(slug)
+        conn = self._conn()
+        row = conn.execute("SELECT html FROM pages WHERE slug = ? AND path = ?", (slug, path)).fetchone()
+        if row is None and "#" in path:
+            row = conn.execute(
+                "SELECT html FROM pages WHERE slug = ? AND path = ?",
+                (slug, path.split("#")[0]),
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_pages(self, slug: str, paths: List[str]) -> Dict[str, str]:
+        """Several pages of one doc in one query; keys are the requested paths."""
+        self.ensure_doc(slug)
+        wanted: Dict[str, List[str]] = {}
+        for path in paths:
+            wanted.setdefault(path.split("#")[0], []).append(path)
+        conn = self._conn()
+        found: Dict[str, str] = {}
+        keys = list(wanted)
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = conn.execute(
+                f"SELECT path, html FROM pages WHERE slug = ? AND path IN ({placeholders})",
+                [slug, *chunk],
+            )
+            for path, html in rows:
+                for requested in wanted[path]:
+                    found[requested] = html
+        return found
+
+    def has_fulltext(self, slug: str) -> bool:
+        row = self._conn().execute("SELECT 1 FROM fts_docs WHERE slug = ?", (slug,)).fetchone()
+        return bool(row)
+
+    def build_fulltext(self, slug: str, titles: Optional[Dict[str, str]] = None) -> int:
+        """Indexes cleaned page bodies of one doc into the FTS5 table (BM25-ranked search)."""
+        self.ensure_doc(slug)
+        with self._slug_lock(slug):
+            built = self._exclusive(
+                f"fts:{slug}",
+                lambda: self._build_fulltext(slug, titles or {}),
+                lambda: self.has_fulltext(slug),
+            )
+            return built or 0
+
+    def _build_fulltext(self, slug: str, titles: Dict[str, str]) -> int:
+        conn = self._conn()
+        pages = conn.execute("SELECT path, html FROM pages WHERE slug = ?", (slug,))
+        rows = [
+            (slug, path, titles.get(path, path), clean_html(html, max_chars=None))
+            for path, html in pages
+        ]
+        with conn:
+            conn.execute("DELETE FROM pages_fts WHERE slug = ?", (slug,))
+            conn.executemany("INSERT INTO pages_fts (slug, path, title, body) VALUES (?, ?, ?, ?)", rows)
+            conn.execute(
+                "INSERT OR REPLACE INTO fts_docs (slug, built_at) VALUES (?, ?)",
+                (slug, time.time()),
+            )
+        return len(rows)
+
+    def search_fulltext(self, slug: str, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        tokens = _FTS_TOKEN_RE.findall(query.lower())
+        if not tokens:
+            return []
+        quoted = [f'"{tok}"' for tok in tokens]
+        conn = self._conn()
+        # All query terms first (implicit AND), then any of them (OR).
+        for match in (" ".join(quoted), " OR ".join(quoted)):
+            rows = conn.execute(
+                "SELECT path, title, snippet(pages_fts, 3, '', '', '...', 16), bm25(pages_fts, 0, 0, 10.0, 1.0) AS rank"
+                " FROM pages_fts WHERE pages_fts MATCH ? AND slug = ?"
+                " ORDER BY rank LIMIT ?",
+                (match, slug, limit),
+            ).fetchall()
+            if rows:
+                return [
+                    {"path": path, "title": title, "snippet": snippet, "score": -rank}
+                    for path, title, snippet, rank in rows
+                ]
+            if len(tokens) == 1:
+                break
+        return []
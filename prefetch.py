@@ -0,0 +1,94 @@
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+from docs_index import DocsCatalog
+from page_store import PageStore
+
+ProgressFn = Callable[[int, int, str], None]
+
+
+def _print_progress(done: int, total: int, message: str):
+    print(f"[{done}/{total}] {message}", file=sys.stderr, flush=True)
+
+
+def prefetch_docs(
+    catalog: DocsCatalog,
+    page_store: PageStore,
+    names: List[str],
+    workers: int = 4,
+    fulltext: bool = True,
+    refresh: bool = False,
+    progress: ProgressFn = _print_progress,
+) -> Dict[str, str]:
+    """Downloads and indexes manifest, index.json, db.json (and the FTS index) for each doc name
+    in parallel, so later searches/reads are cache hits. Returns name -> slug or error text."""
+    results: Dict[str, str] = {}
+    total = len(names)
+    done = 0
+    lock = threading.Lock()
+
+    def _one(name: str) -> str:
+        started = time.monotonic()
+        slug = catalog.resolve_slug(name)
+        if not slug:
+            return f"не найдена: {name}"
+        index = catalog.slug_index(slug)
+        if refresh:
+            page_store.refresh_doc(slug)
+        else:
+            page_store.ensure_doc(slug)
+        if fulltext and not page_store.has_fulltext(slug):
+            page_store.build_fulltext(slug, index.page_titles())
+        return f"{slug} ({len(index.entries)} entries, {time.monotonic() - started:.1f}s)"
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="prefetch") as executor:
+        futures = {executor.submit(_one, name): name for name in names}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                results[name] = f"ошибка: {e}"
+            with lock:
+                done += 1
+                progress(done, total, f"{name}: {results[name]}")
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Warm the local DevDocs cache before interviews.")
+    parser.add_argument("slugs", nargs="*", help="doc names/slugs (default: config.DEV_DOCS_SLUGS)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--no-fulltext", action="store_true", help="skip building the FTS index")
+    parser.add_argument("--refresh", action="store_true", help="revalidate already cached docs (conditional GET)")
+    args = parser.parse_args(argv)
+
+    slugs = args.slugs
+    if not slugs:
+        from config import DEV_DOCS_SLUGS
+        slugs = DEV_DOCS_SLUGS
+
+    # Same catalog/page store (and DEVDOCS_URL / DEVDOCS_BUNDLE settings) as the MCP server.
+    import server
+
+    started = time.monotonic()
+    results = prefetch_docs(
+        server.catalog,
+        server.page_store,
+        slugs,
+        workers=args.workers,
+        fulltext=not args.no_fulltext,
+        refresh=args.refresh,
+    )
+    failed = [name for name, status in results.items() if status.startswith(("ошибка", "не найдена"))]
+    print(f"Prefetched {len(results) - len(failed)}/{len(results)} docs in {time.monotonic() - started:.1f}s")
+    if failed:
+        print(f"Not prefetched: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ import json
 import logging
 from typing import Tuple
 
-from config import DEBUG_RAG, llm
+from config import DEBUG_RAG, get_llm
 from helpers import extract_json_object, safe_print
 from models import QAItem
 from rag_store import rag_context_for
@@ -65,7 +65,7 @@ Return ONLY JSON:
 CONTEXT:
 {rag_ctx}
 """
-    resp = llm.invoke([("human", prompt)])
+    resp = get_llm().invoke([("human", prompt)])
     obj = extract_json_object(resp.content)
     try:
         data = json.loads(obj)
@@ -106,7 +106,7 @@ Return JSON:
   "topic": "..."
 }}
 """
-    resp = llm.invoke([("human", prompt)])
+    resp = get_llm().invoke([("human", prompt)])
     obj = extract_json_object(resp.content)
 
     try:
@@ -1,42 +1,204 @@
+import hashlib
+import os
 import threading
-from typing import List, Optional
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
 
-from langchain_chroma import Chroma
 from langchain_core.documents import Document
-from langchain_huggingface import HuggingFaceEmbeddings
 
-VECTOR_LOCK = threading.RLock()
+from embedding_cache import CachedEmbeddings
+from numpy_index import NumpyVectorIndex
+from page_store import DEVDOCS_CACHE_DIR
 
-embeddings = HuggingFaceEmbeddings(
-    model_name="sentence-transformers/all-mpnet-base-v2",
-    model_kwargs={"device": "cpu"},
-    encode_kwargs={"normalize_embeddings": True},
-)
 
-vector_store = Chroma(
-    collection_name="devdocs_knowledge",
-    embedding_function=embeddings,
-    persist_directory=None,
-)
+class ReadWriteLock:
+    """Many concurrent readers or one writer; a waiting writer blocks new readers so ingestion is not starved."""
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+# Searches share the read side; only the upsert that publishes a batch takes
+# the write side. Embedding (documents and queries) never runs under it.
+VECTOR_LOCK = ReadWriteLock()
+
+# Documents per embedding/upsert call and the longest a partial batch may wait.
+EMBED_BATCH_SIZE = 32
+EMBED_FLUSH_SECONDS = 2.0
+# Chroma data survives restarts here, so already indexed sections are not re-embedded.
+VECTOR_STORE_DIR = os.environ.get("VECTOR_STORE_DIR", os.path.join(DEVDOCS_CACHE_DIR, "chroma"))
+# "chroma" (persistent) or "numpy" (in-memory NumpyVectorIndex, per-tech partitions, exact top-k).
+VECTOR_BACKEND = os.environ.get("VECTOR_BACKEND", "chroma")
+
+EMBEDDING_MODEL = "sentence-transformers/all-mpnet-base-v2"
+
+_embeddings: Optional[CachedEmbeddings] = None
+_vector_store = None
+_init_lock = threading.Lock()
+
+
+def get_embeddings() -> CachedEmbeddings:
+    """The embedding model, loaded on first use (several seconds on CPU)."""
+    global _embeddings
+    if _embeddings is None:
+        with _init_lock:
+            if _embeddings is None:
+                from langchain_huggingface import HuggingFaceEmbeddings
+
+                _embeddings = CachedEmbeddings(
+                    HuggingFaceEmbeddings(
+                        model_name=EMBEDDING_MODEL,
+                        model_kwargs={"device": "cpu"},
+                        encode_kwargs={"normalize_embeddings": True},
+                    ),
+                    model_name=EMBEDDING_MODEL,
+                )
+    return _embeddings
+
+
+def get_vector_store():
+    """The VECTOR_BACKEND store, created on first use: a Chroma collection or a NumpyVectorIndex."""
+    global _vector_store
+    if _vector_store is None and VECTOR_BACKEND == "numpy":
+        with _init_lock:
+            if _vector_store is None:
+                _vector_store = NumpyVectorIndex()
+    if _vector_store is None:
+        embeddings = get_embeddings()
+        with _init_lock:
+            if _vector_store is None:
+                from langchain_chroma import Chroma
+
+                _vector_store = Chroma(
+                    collection_name="devdocs_knowledge",
+                    embedding_function=embeddings,
+                    persist_directory=VECTOR_STORE_DIR,
+                )
+    return _vector_store
+
+
+def _clean_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in (metadata or {}).items() if value is not None}
+
+
+def doc_id(doc: Document) -> str:
+    """Content address of a document: hash of (tech, slug, path, section, text).
+
+    The tech is part of the id because searches filter by it: a section loaded for a
+    second tech is stored again under that tech (its vector comes from the embedding cache).
+    """
+    meta = doc.metadata or {}
+    key = "\x1f".join(
+        [
+            str(meta.get("tech") or ""),
+            str(meta.get("doc_slug") or meta.get("tech") or ""),
+            str(meta.get("path") or ""),
+            str(meta.get("section") or ""),
+            doc.page_content or "",
+        ]
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def vs_existing_ids(ids: List[str]) -> set:
+    if not ids:
+        return set()
+    vector_store = get_vector_store()
+    if isinstance(vector_store, NumpyVectorIndex):
+        return vector_store.existing_ids(ids)
+    with VECTOR_LOCK.read():
+        found = vector_store._collection.get(ids=list(ids), include=[])
+    return set(found.get("ids") or [])
+
+
+def vs_new_documents(docs: List[Document]) -> List[Document]:
+    """Drops documents already in the store and duplicates within `docs`."""
+    unique: Dict[str, Document] = {}
+    for doc in docs:
+        unique.setdefault(doc_id(doc), doc)
+    existing = vs_existing_ids(list(unique))
+    return [doc for key, doc in unique.items() if key not in existing]
+
+
+def vs_embed_documents(docs: List[Document]) -> List[List[float]]:
+    """Embeds page contents in one model call; runs without VECTOR_LOCK."""
+    if not docs:
+        return []
+    return get_embeddings().embed_documents([doc.page_content for doc in docs])
+
+
+def vs_upsert_embedded(docs: List[Document], vectors: List[List[float]]) -> None:
+    """Writes already embedded documents to the collection in one upsert."""
+    if not docs:
+        return
+    ids = [doc_id(doc) for doc in docs]
+    texts = [doc.page_content for doc in docs]
+    metadatas = [_clean_metadata(doc.metadata) for doc in docs]
+    vector_store = get_vector_store()
+    if isinstance(vector_store, NumpyVectorIndex):
+        # The index publishes each partition by swapping its snapshot; readers take no lock.
+        vector_store.add(ids, docs, vectors)
+        return
+    with VECTOR_LOCK.write():
+        vector_store._collection.upsert(ids=ids, embeddings=vectors, documents=texts, metadatas=metadatas)
 
 
 def vs_add_documents(docs: List[Document]) -> None:
-    with VECTOR_LOCK:
-        vector_store.add_documents(docs)
+    docs = vs_new_documents(docs)
+    if not docs:
+        return
+    vs_upsert_embedded(docs, vs_embed_documents(docs))
 
 
 def vs_similarity_search(query: str, k: int, tech: Optional[str] = None) -> List[Document]:
-    with VECTOR_LOCK:
+    # The query is embedded before taking the lock; searches only share its read side.
+    query_vector = get_embeddings().embed_query(query)
+    vector_store = get_vector_store()
+    if isinstance(vector_store, NumpyVectorIndex):
+        return vector_store.search(query_vector, k=k, tech=tech)
+    with VECTOR_LOCK.read():
         if tech is not None:
             try:
-                return vector_store.similarity_search(query, k=k, filter={"tech": tech})
+                return vector_store.similarity_search_by_vector(query_vector, k=k, filter={"tech": tech})
             except TypeError:
                 pass
             except Exception:
                 pass
 
         internal_k = max(k * 3, 12)
-        docs = vector_store.similarity_search(query, k=internal_k)
+        docs = vector_store.similarity_search_by_vector(query_vector, k=internal_k)
         if tech is None:
             return docs[:k]
         filtered = [d for d in docs if d.metadata.get("tech") == tech]
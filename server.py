@@ -1,77 +1,365 @@
 import json
-import requests
-from mcp.server.fastmcp import FastMCP
+import logging
+import os
+import sys
+import threading
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import anyio
+from mcp.server.fastmcp import Context, FastMCP
+
+from blob_transfer import offload, offload_json
+from docs_index import BundleCatalog, DocsCatalog
+from html_text import render_page, select_section, split_sections
+from page_store import PageStore, PageStoreError
+from prefetch import ProgressFn, prefetch_docs
+
 DEVDOCS_URL = "http://localhost:9292"
+# Путь к офлайн-бандлу (devdocs_bundle.py): если задан, сервер не ходит в сеть.
+DEVDOCS_BUNDLE = os.environ.get("DEVDOCS_BUNDLE", "")
+# Сколько вызовов инструментов выполняется одновременно (в потоках).
+TOOL_CONCURRENCY = 16
 
 mcp = FastMCP("MegaSchool Server")
+if DEVDOCS_BUNDLE:
+    page_store = PageStore(DEVDOCS_URL, cache_dir=DEVDOCS_BUNDLE, offline=True)
+    catalog = BundleCatalog(DEVDOCS_BUNDLE)
+else:
+    page_store = PageStore(DEVDOCS_URL)
+    catalog = DocsCatalog(DEVDOCS_URL)
 
 
-@mcp.tool()
-def search_devdocs(doc_name: str, keyword: str) -> str:
-    try:
-        manifest_url = f"{DEVDOCS_URL}/docs/docs.json"
-        resp = requests.get(manifest_url, timeout=2)
-        docs_list = resp.json()
+# Документации, для которых FTS-индекс сейчас строится в фоновом потоке.
+_fulltext_builds: set = set()
+_fulltext_lock = threading.Lock()
+
+
+def _build_fulltext_in_background(slug: str):
+    """Запускает построение FTS-индекса в фоне (не более одного на slug)."""
+    with _fulltext_lock:
+        if slug in _fulltext_builds:
+            return
+        _fulltext_builds.add(slug)
+
+    def build():
+        try:
+            page_store.build_fulltext(slug, catalog.slug_index(slug).page_titles())
+        except Exception as e:
+            logging.warning(f"[FTS] {slug}: index build failed: {e}")
+        finally:
+            with _fulltext_lock:
+                _fulltext_builds.discard(slug)
+
+    threading.Thread(target=build, name=f"fts-{slug}", daemon=True).start()
+
 
-        target_doc = next((d for d in docs_list if d['slug'].startswith(doc_name.lower())), None)
-        if not target_doc:
+# Реализации инструментов возвращают Python-объекты (список результатов или
+# строку с ошибкой). MCP-обёртки ниже сериализуют их в текст, а in-process
+# клиент (mcp_client.InProcessMCPClient) вызывает их напрямую из TOOL_IMPLS.
+
+def _search_devdocs(doc_name: str, keyword: str, limit: int = 10, offset: int = 0) -> Union[List[dict], str]:
+    try:
+        # docs.json и index.json кэшируются в процессе (TTL + ETag),
+        # slug ищется по префиксной карте, ранжирование — по заранее
+        # построенным индексам токенов и триграмм.
+        slug = catalog.resolve_slug(doc_name)
+        if not slug:
             return f"Документация '{doc_name}' не найдена."
 
-        slug = target_doc['slug']
-        index_url = f"{DEVDOCS_URL}/docs/{slug}/index.json"
-        idx_resp = requests.get(index_url, timeout=5)
-        entries = idx_resp.json()['entries']
+        entries = catalog.slug_index(slug).search(keyword, limit=limit, offset=offset)
 
         results = []
         for entry in entries:
-            if keyword.lower() in entry['name'].lower():
-                results.append({
-                    "title": entry['name'],
-                    # Важно: возвращаем эти поля, чтобы LLM могла их использовать в след. шаге
-                    "doc_slug": slug,
-                    "path": entry['path'],
-                    "url": f"{DEVDOCS_URL}/{slug}/{entry['path']}"
-                })
-                # if len(results) >= 5: break
-
-        return json.dumps(results, indent=2, ensure_ascii=False)
+            results.append({
+                "title": entry['name'],
+                # Важно: возвращаем эти поля, чтобы LLM могла их использовать в след. шаге
+                "doc_slug": slug,
+                "path": entry['path'],
+                "url": f"{DEVDOCS_URL}/{slug}/{entry['path']}"
+            })
+
+        return results
     except Exception as e:
         return f"Ошибка поиска: {e}"
 
 
+def _page_sections(html_content: str, section: str = "") -> Optional[List[dict]]:
+    """Разделы статьи по заголовкам ({"anchor", "title", "text"}); None — раздел не найден."""
+    if section:
+        html_content = select_section(html_content, section)
+        if not html_content:
+            return None
+    return split_sections(html_content)
+
+
+def _read_devdocs_page(
+    doc_slug: str,
+    path: str,
+    format: str = "html",
+    max_chars: int = 3500,
+    section: str = "",
+    transfer: str = "inline",
+) -> Union[str, dict]:
+    try:
+        # db.json скачивается один раз на slug и раскладывается по страницам
+        # в локальное хранилище, дальше чтение — один lookup по (slug, path).
+        html_content = page_store.get_page(doc_slug, path)
+
+        if not html_content:
+            return "Статья не найдена в базе данных (проверьте path)."
+
+        # Очистка и обрезка выполняются здесь, рядом с данными: по pipe
+        # уходит только то, что клиент реально использует.
+        if format == "sections":
+            sections = _page_sections(html_content, section)
+            if sections is None:
+                return f"Раздел '{section}' не найден в статье."
+            return offload_json(sections) if transfer == "file" else sections
+        content = render_page(html_content, format, max_chars, section)
+        if not content:
+            if section:
+                return f"Раздел '{section}' не найден в статье."
+            return "Статья пуста."
+        return offload(content) if transfer == "file" else content
+
+    except PageStoreError as e:
+        return str(e)
+    except Exception as e:
+        return f"Ошибка чтения статьи: {e}"
+
+
+def _read_devdocs_pages(
+    pages: List[dict],
+    format: str = "html",
+    max_chars: int = 3500,
+    transfer: str = "inline",
+) -> Union[List[dict], str]:
+    try:
+        by_slug: Dict[str, List[str]] = {}
+        for page in pages:
+            by_slug.setdefault(page.get("doc_slug") or "", []).append(page.get("path") or "")
+
+        # Каждая база (slug) загружается и читается один раз на весь батч.
+        contents: Dict[tuple, Union[str, Exception]] = {}
+        for slug, paths in by_slug.items():
+            try:
+                for path, html in page_store.get_pages(slug, paths).items():
+                    contents[(slug, path)] = html
+            except Exception as e:
+                for path in paths:
+                    contents[(slug, path)] = e
+
+        results = []
+        for page in pages:
+            slug = page.get("doc_slug") or ""
+            path = page.get("path") or ""
+            item = {"doc_slug": slug, "path": path}
+            content = contents.get((slug, path))
+            if isinstance(content, PageStoreError):
+                item["error"] = str(content)
+            elif isinstance(content, Exception):
+                item["error"] = f"Ошибка чтения статьи: {content}"
+            elif not content:
+                item["error"] = "Статья не найдена в базе данных (проверьте path)."
+            else:
+                section = page.get("section") or ""
+                if format == "sections":
+                    sections = _page_sections(content, section)
+                    if sections is None:
+                        item["error"] = f"Раздел '{section}' не найден в статье."
+                    else:
+                        item["content"] = offload_json(sections) if transfer == "file" else sections
+                    results.append(item)
+                    continue
+                rendered = render_page(content, format, max_chars, section)
+                if rendered:
+                    item["content"] = offload(rendered) if transfer == "file" else rendered
+                elif section:
+                    item["error"] = f"Раздел '{section}' не найден в статье."
+                else:
+                    item["content"] = ""
+            results.append(item)
+        return results
+    except Exception as e:
+        return f"Ошибка чтения статей: {e}"
+
+
+def _search_devdocs_fulltext(doc_name: str, query: str, limit: int = 5) -> Union[List[dict], str]:
+    try:
+        slug = catalog.resolve_slug(doc_name)
+        if not slug:
+            return f"Документация '{doc_name}' не найдена."
+
+        # Индекс строится через prefetch_devdocs / devdocs_bundle.py --fulltext.
+        # Строить его здесь, в вызове, — это clean_html по всем страницам доки,
+        # поэтому без индекса отвечаем сразу (клиент уходит на запасной поиск),
+        # а сборку запускаем в фоне для следующих запросов.
+        if not page_store.has_fulltext(slug):
+            _build_fulltext_in_background(slug)
+            return f"Полнотекстовый индекс для '{slug}' ещё не построен (строится в фоне)."
+
+        results = []
+        for hit in page_store.search_fulltext(slug, query, limit=limit):
+            results.append({
+                "title": hit["title"],
+                "doc_slug": slug,
+                "path": hit["path"],
+                "url": f"{DEVDOCS_URL}/{slug}/{hit['path']}",
+                "snippet": hit["snippet"],
+            })
+
+        return results
+    except PageStoreError as e:
+        return str(e)
+    except Exception as e:
+        return f"Ошибка поиска: {e}"
+
+
+def _prefetch_devdocs(
+    slugs: Optional[List[str]] = None,
+    fulltext: bool = True,
+    workers: int = 4,
+    progress: Optional[ProgressFn] = None,
+) -> Union[Dict[str, str], str]:
+    try:
+        if not slugs:
+            from config import DEV_DOCS_SLUGS
+            slugs = DEV_DOCS_SLUGS
+        kwargs = {"progress": progress} if progress else {}
+        return prefetch_docs(catalog, page_store, slugs, workers=workers, fulltext=fulltext, **kwargs)
+    except Exception as e:
+        return f"Ошибка прогрева: {e}"
+
+
+def _as_text(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, indent=2, ensure_ascii=False)
+
+
+TOOL_IMPLS: Dict[str, Callable[..., Any]] = {
+    "search_devdocs": _search_devdocs,
+    "read_devdocs_page": _read_devdocs_page,
+    "read_devdocs_pages": _read_devdocs_pages,
+    "search_devdocs_fulltext": _search_devdocs_fulltext,
+    "prefetch_devdocs": _prefetch_devdocs,
+}
+
+
+_tool_limiter: Optional[anyio.CapacityLimiter] = None
+
+
+async def _run_tool(fn: Callable[..., Any], *args: Any) -> Any:
+    # Реализации блокирующие (HTTP, SQLite), поэтому выполняются в пуле потоков:
+    # FastMCP обрабатывает запросы конкурентно, и один долгий вызов не
+    # блокирует event loop для остальных.
+    global _tool_limiter
+    if _tool_limiter is None:
+        _tool_limiter = anyio.CapacityLimiter(TOOL_CONCURRENCY)
+    return await anyio.to_thread.run_sync(partial(fn, *args), limiter=_tool_limiter)
+
+
 @mcp.tool()
-def read_devdocs_page(doc_slug: str, path: str) -> str:
+async def search_devdocs(doc_name: str, keyword: str, limit: int = 10, offset: int = 0) -> str:
     """
-    Шаг 2. Загружает полный HTML текст статьи.
+    Шаг 1. Ищет статьи по названию, лучшие совпадения первыми.
+    Args:
+        doc_name: название документации (например 'python')
+        keyword: ключевое слово
+        limit: сколько результатов вернуть
+        offset: сколько лучших результатов пропустить (пагинация)
+    """
+    return _as_text(await _run_tool(_search_devdocs, doc_name, keyword, limit, offset))
+
+
+@mcp.tool()
+async def read_devdocs_page(
+    doc_slug: str,
+    path: str,
+    format: str = "html",
+    max_chars: int = 3500,
+    section: str = "",
+    transfer: str = "inline",
+) -> str:
+    """
+    Шаг 2. Загружает текст статьи.
     Args:
         doc_slug: slug документации (например 'python~3.14')
         path: путь к статье (например 'library/asyncio')
+        format: 'html' — полный HTML, 'text' — очищенный текст,
+            'sections' — список разделов [{"anchor", "title", "text"}] с очищенным текстом
+        max_chars: лимит длины для format='text' (0 — без лимита)
+        section: id заголовка/якоря, чтобы вернуть только этот раздел
+        transfer: 'file' — большой ответ кладётся в файл общего кэша,
+            возвращается только ссылка {"$blob": путь, "sha256", "size"}
     """
-    try:
-        # 1. Загружаем базу данных конкретной доки (Внимание: файл может быть большим!)
-        db_url = f"{DEVDOCS_URL}/docs/{doc_slug}/db.json"
-        response = requests.get(db_url, timeout=10)
+    return _as_text(await _run_tool(_read_devdocs_page, doc_slug, path, format, max_chars, section, transfer))
 
-        if response.status_code != 200:
-            return f"Ошибка загрузки базы данных: {response.status_code}"
 
-        db_data = response.json()
+@mcp.tool()
+async def read_devdocs_pages(
+    pages: List[dict],
+    format: str = "html",
+    max_chars: int = 3500,
+    transfer: str = "inline",
+) -> str:
+    """
+    Загружает несколько статей за один вызов.
+    Args:
+        pages: список {"doc_slug": ..., "path": ..., "section": (необязательно)}
+        format: 'html' — как есть, 'text' — уже очищенный текст,
+            'sections' — очищенный текст, разбитый на разделы по заголовкам
+        max_chars: лимит длины каждой статьи для format='text' (0 — без лимита)
+        transfer: 'file' — большие статьи передаются ссылкой на файл (см. read_devdocs_page)
+    Returns:
+        JSON-список {"doc_slug", "path", "content"} или {"doc_slug", "path", "error"} в порядке запроса
+    """
+    return _as_text(await _run_tool(_read_devdocs_pages, pages, format, max_chars, transfer))
 
-        # 2. Достаем контент по ключу
-        # Иногда path в индексе совпадает с ключом, иногда нет.
-        # DevDocs хранит контент просто как строку HTML в значении ключа
-        html_content = db_data.get(path)
 
-        if not html_content:
-            return "Статья не найдена в базе данных (проверьте path)."
+@mcp.tool()
+async def search_devdocs_fulltext(doc_name: str, query: str, limit: int = 5) -> str:
+    """
+    Полнотекстовый поиск по содержимому статей (SQLite FTS5, BM25).
+    Индекс строится prefetch_devdocs; если его ещё нет, инструмент сразу
+    возвращает сообщение об этом и запускает построение в фоне.
+    Args:
+        doc_name: название документации (например 'go')
+        query: текст запроса (например 'context cancellation')
+        limit: сколько результатов вернуть
+    """
+    return _as_text(await _run_tool(_search_devdocs_fulltext, doc_name, query, limit))
 
-        # 3. (Опционально) Можно почистить HTML от лишних тегов,
-        # чтобы экономить токены. Но пока вернем как есть.
-        # return html_content[:5000]  # Ограничим длину на всякий случай
-        return html_content  # Ограничим длину на всякий случай
 
-    except Exception as e:
-        return f"Ошибка чтения статьи: {e}"
+@mcp.tool()
+async def prefetch_devdocs(
+    slugs: Optional[List[str]] = None,
+    fulltext: bool = True,
+    workers: int = 4,
+    ctx: Optional[Context] = None,
+) -> str:
+    """
+    Прогрев кэша: параллельно скачивает и индексирует манифест, index.json,
+    db.json (и полнотекстовый индекс) для списка документаций.
+    Args:
+        slugs: названия/slug-и (по умолчанию — все config.DEV_DOCS_SLUGS)
+        fulltext: строить ли полнотекстовый индекс
+        workers: сколько документаций грузить одновременно
+    Returns:
+        JSON {название: slug и статистика или текст ошибки}
+    """
+    def progress(done: int, total: int, message: str):
+        # Из рабочего потока: пишем в stderr (клиент сливает его в лог) и, если
+        # клиент передал progressToken, отправляем MCP-уведомление о прогрессе.
+        print(f"[prefetch {done}/{total}] {message}", file=sys.stderr, flush=True)
+        if ctx is not None:
+            try:
+                anyio.from_thread.run(ctx.report_progress, done, total)
+            except Exception:
+                pass
+
+    return _as_text(await _run_tool(_prefetch_devdocs, slugs, fulltext, workers, progress))
 
 
 if __name__ == "__main__":
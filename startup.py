@@ -0,0 +1,51 @@
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class Warmup:
+    """Starts slow initializers (models, clients, subprocesses) on background threads and
+    records when each became ready, relative to the moment the Warmup was created."""
+
+    def __init__(self, max_workers: int = 4):
+        self.started_at = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+        self._futures: Dict[str, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="warmup")
+
+    def start(self, name: str, fn: Callable[[], Any]) -> Future:
+        future = self._executor.submit(fn)
+        future.add_done_callback(lambda f: self._done(name, f))
+        self._futures[name] = future
+        return future
+
+    def _done(self, name: str, future: Future):
+        self.mark(name)
+        if future.exception() is not None:
+            logging.warning(f"[STARTUP] {name} failed: {future.exception()}")
+        else:
+            logging.info(f"[STARTUP] {name} ready after {self.timings[name]:.2f}s")
+
+    def mark(self, name: str) -> float:
+        elapsed = time.perf_counter() - self.started_at
+        self.timings[name] = elapsed
+        return elapsed
+
+    def result(self, name: str, timeout: float = None) -> Any:
+        """Waits for a started initializer and returns its value (re-raising its error)."""
+        return self._futures[name].result(timeout=timeout)
+
+    def ready(self, name: str) -> bool:
+        future = self._futures.get(name)
+        return future is not None and future.done() and future.exception() is None
+
+    def report(self) -> str:
+        parts = [f"{name}={elapsed:.2f}s" for name, elapsed in sorted(self.timings.items(), key=lambda kv: kv[1])]
+        pending = [name for name, future in self._futures.items() if not future.done()]
+        if pending:
+            parts.append(f"pending: {', '.join(pending)}")
+        return "; ".join(parts)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
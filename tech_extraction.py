@@ -2,7 +2,7 @@ import json
 import re
 from typing import List
 
-from config import DEV_DOCS_SLUGS, TECH_SYNONYMS, llm
+from config import DEV_DOCS_SLUGS, TECH_SYNONYMS, get_llm
 from helpers import extract_json_array
 
 
@@ -20,7 +20,7 @@ User text:
 {user_text}
 """
 
-    resp = llm.invoke([("human", prompt)])
+    resp = get_llm().invoke([("human", prompt)])
     arr = extract_json_array(resp.content)
 
     llm_slugs: List[str] = []